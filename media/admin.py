@@ -6,6 +6,7 @@ from django.utils.html import format_html, mark_safe
 
 from media.models import MediaItem
 from media.tasks import generate_summary, process_media
+from media.utils import invalidate_ready_count
 
 DEMO_GROUP = 'DemoReadOnly'
 
@@ -256,6 +257,8 @@ class MediaItemAdmin(admin.ModelAdmin, DemoReadOnlyAdminMixin):
         count = queryset.filter(status=MediaItem.STATUS_READY).update(
             status=MediaItem.STATUS_ARCHIVED, archived_at=timezone.now()
         )
+        # queryset.update() bypasses the post_save signal
+        invalidate_ready_count()
         self.message_user(request, f'Archived {count} items.')
 
     archive_items.short_description = 'Archive selected items'
@@ -266,6 +269,8 @@ class MediaItemAdmin(admin.ModelAdmin, DemoReadOnlyAdminMixin):
         count = queryset.filter(status=MediaItem.STATUS_ARCHIVED).update(
             status=MediaItem.STATUS_READY, archived_at=None
         )
+        # queryset.update() bypasses the post_save signal
+        invalidate_ready_count()
         self.message_user(request, f'Unarchived {count} items.')
 
     unarchive_items.short_description = 'Unarchive selected items'
@@ -10,4 +10,5 @@ class MediaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
 
     def ready(self):
-        """Import signals when the app is ready"""
+        """Connect signal receivers when the app is ready"""
+        import media.receivers  # noqa: F401
@@ -1,10 +1,16 @@
+import hashlib
+
 from django.conf import settings
 from django.contrib.syndication.views import Feed
+from django.db.models import Count, Max
 from django.http import HttpResponseForbidden
 from django.templatetags.static import static
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
 from django.utils.feedgenerator import Rss201rev2Feed
+from django.utils.http import quote_etag
 
+from media.apps import DEPLOY_TIME
 from media.models import MediaItem
 from media.utils import build_media_url
 
@@ -88,6 +94,12 @@ class BaseFeed(Feed):
                     'User token required. Add ?token=YOUR_TOKEN to the feed URL.'
                 )
 
+        # Let polling podcast clients skip the render when nothing has changed
+        etag = self._etag(request)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
         # Store request so we can build absolute URLs everywhere
         self.request = request
         # Precompute absolute link for the channel
@@ -98,8 +110,33 @@ class BaseFeed(Feed):
         if request.GET.get('view') == '1':
             response['Content-Type'] = 'text/xml; charset=utf-8'
 
+        response['ETag'] = etag
         return response
 
+    def _etag(self, request):
+        """
+        Return an ETag for the feed's current item set and rendering.
+
+        Built from the item count and latest updated_at, so adding, editing,
+        archiving or deleting an item all change it. The deploy time, host,
+        media base URL and feed image URL are included too, since they change
+        the rendered XML without touching any item.
+        """
+        state = self.get_queryset().aggregate(count=Count('pk'), latest=Max('updated_at'))
+        latest = state['latest'].timestamp() if state['latest'] else 0
+        parts = [
+            state['count'],
+            latest,
+            request.GET.get('view', ''),
+            DEPLOY_TIME.timestamp(),
+            request.scheme,
+            request.get_host(),
+            settings.STASHCAST_MEDIA_BASE_URL,
+            static(f'media/{self.logo_filename}') if self.logo_filename else '',
+        ]
+        digest = hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()
+        return quote_etag(digest[:32])
+
     def absolute_url(self, url):
         """Convert relative URLs to absolute using the current request."""
         if not url:
@@ -0,0 +1,39 @@
+"""
+Signal receivers connected by MediaConfig.ready().
+
+Kept apart from media.signals, whose file-deleting pre_delete receiver is not
+connected.
+"""
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from media.models import MediaItem
+from media.utils import invalidate_ready_count
+
+
+@receiver(post_init, sender=MediaItem)
+def remember_loaded_status(sender, instance, **kwargs):
+    """Record the status an item was loaded with, so saves can tell if it changed."""
+    # Read __dict__ so a deferred status field is not fetched; None means unknown
+    instance._loaded_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=MediaItem)
+def invalidate_ready_count_on_status_change(sender, instance, created, **kwargs):
+    """
+    Drop the cached READY count when an item's status changes.
+
+    Progress and metadata saves during processing leave the status alone and
+    keep the cache.
+    """
+    status = instance.__dict__.get('status')
+    if created or status is None or status != instance._loaded_status:
+        invalidate_ready_count()
+    instance._loaded_status = status
+
+
+@receiver(post_delete, sender=MediaItem)
+def invalidate_ready_count_on_delete(sender, instance, **kwargs):
+    """Drop the cached READY count when an item is deleted."""
+    invalidate_ready_count()
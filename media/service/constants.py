@@ -20,6 +20,9 @@ MEDIA_EXTENSIONS = [
     '.mov',
 ]
 
+# Same extensions as a tuple, for a single str.endswith() check
+MEDIA_EXTENSION_SUFFIXES = tuple(MEDIA_EXTENSIONS)
+
 # Audio-specific file extensions
 AUDIO_EXTENSIONS = ['.mp3', '.m4a', '.ogg', '.wav', '.aac', '.flac', '.opus']
 
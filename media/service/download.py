@@ -135,9 +135,10 @@ def _download_apple_podcasts(url, temp_dir, logger=None):
     Fetches the Apple Podcasts page to extract the stream URL, then downloads
     the audio file directly.
     """
-    import json
     import re
 
+    from media.service.resolve import extract_apple_podcasts_data
+
     def log(message):
         if logger:
             logger(message)
@@ -151,13 +152,7 @@ def _download_apple_podcasts(url, temp_dir, logger=None):
     resp = requests.get(url, timeout=30)
     resp.raise_for_status()
 
-    pattern = r'<script [^>]*\bid=["\']serialized-server-data["\'][^>]*>(.*?)</script>'
-    match = re.search(pattern, resp.text, re.DOTALL)
-    if not match:
-        raise Exception('Could not find serialized-server-data in Apple Podcasts page')
-
-    raw = json.loads(match.group(1).strip())
-    inner = raw['data'][0]['data']
+    inner = extract_apple_podcasts_data(resp.text)
 
     # Find stream URL from headerButtonItems
     stream_url = None
@@ -6,12 +6,21 @@ Centralizes ffprobe parsing and extension-based media detection.
 
 import json
 import subprocess
+from types import MappingProxyType
 
 from media.service.constants import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS
 from media.service.config import get_target_audio_format, get_target_video_format
 
 GENERIC_TITLES = {'content', 'downloaded-media', 'untitled', None, ''}
 
+# Extension -> (has_audio, has_video), built once so lookups are a single dict hit
+_EXTENSION_STREAMS = MappingProxyType(
+    {
+        **{ext: (True, True) for ext in VIDEO_EXTENSIONS},
+        **{ext: (True, False) for ext in AUDIO_EXTENSIONS},
+    }
+)
+
 
 def normalize_extension(extension):
     """Normalize a file extension for comparison."""
@@ -46,13 +55,8 @@ def get_streams_from_extension(extension):
     Returns:
         tuple[bool, bool]: (has_audio, has_video)
     """
-    ext = normalize_extension(extension)
-    if ext in AUDIO_EXTENSIONS:
-        return True, False
-    if ext in VIDEO_EXTENSIONS:
-        return True, True
     # Default to video+audio for unknown extensions
-    return True, True
+    return _EXTENSION_STREAMS.get(normalize_extension(extension), (True, True))
 
 
 def extract_ffprobe_metadata(file_path):
@@ -4,16 +4,27 @@ Metadata extraction and media type resolution.
 Handles prefetching metadata and determining the actual media type.
 """
 
-from dataclasses import dataclass, field
+import hashlib
+import json
+import re
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
+from types import MappingProxyType
 from typing import List, Optional
 from urllib.parse import urlparse
 
 import yt_dlp
 from django.conf import settings
+from django.core.cache import cache
 
 from media.service.media_info import get_streams_from_extension
-from media.service.constants import MEDIA_EXTENSIONS
+from media.service.constants import MEDIA_EXTENSION_SUFFIXES
+
+
+# Apple Podcasts pages embed episode metadata as JSON in this script tag
+APPLE_SERVER_DATA_PATTERN = re.compile(
+    r'<script [^>]*\bid=["\']serialized-server-data["\'][^>]*>(.*?)</script>', re.DOTALL
+)
 
 
 class PlaylistNotSupported(Exception):
@@ -61,7 +72,7 @@ class SpotifyUrlDetected(Exception):
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class EntryInfo:
     """Information about a single entry in a multi-item result"""
 
@@ -71,7 +82,7 @@ class EntryInfo:
     thumbnail_url: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PrefetchResult:
     """Result from prefetching metadata"""
 
@@ -101,10 +112,11 @@ def prefetch(url, strategy, logger=None):
         logger: Optional callable(str) for logging
 
     Returns:
-        PrefetchResult with metadata
+        PrefetchResult with metadata. Playlists and other multi-item URLs
+        return is_multiple=True with one EntryInfo per item.
 
     Raises:
-        PlaylistNotSupported: If URL is a playlist
+        ValueError: If the strategy is unknown
     """
 
     def log(message):
@@ -144,9 +156,9 @@ def _prefetch_file(file_path, logger=None):
 
 def _prefetch_direct(url, logger=None):
     """Prefetch metadata for direct media URL"""
-    parsed = urlparse(url)
-    filename = Path(parsed.path).stem
-    ext = Path(parsed.path).suffix.lower()
+    path = Path(urlparse(url).path)
+    filename = path.stem
+    ext = path.suffix.lower()
 
     result = PrefetchResult()
     result.title = filename or 'downloaded-media'
@@ -169,6 +181,30 @@ def _is_apple_podcasts_url(url):
     return parsed.hostname in ('podcasts.apple.com',) and '?i=' in url
 
 
+def extract_apple_podcasts_data(html):
+    """
+    Extract the episode data embedded in an Apple Podcasts page.
+
+    The page carries its metadata as JSON in a serialized-server-data script tag,
+    so a single precompiled regex scan is enough; no HTML tree is built.
+
+    Returns:
+        dict: The inner data object with 'shelves' and 'headerButtonItems'
+
+    Raises:
+        ValueError: If the page has no serialized-server-data script
+    """
+    match = APPLE_SERVER_DATA_PATTERN.search(html)
+    if not match:
+        raise ValueError('Could not find serialized-server-data in Apple Podcasts page')
+
+    raw = json.loads(match.group(1).strip())
+
+    # Navigate Apple's data structure:
+    # {"data": [{"intent": ..., "data": {"shelves": [...], "headerButtonItems": [...]}}]}
+    return raw['data'][0]['data']
+
+
 def _prefetch_apple_podcasts(url, logger=None):
     """
     Fallback extractor for Apple Podcasts when yt-dlp's extractor is broken.
@@ -176,9 +212,6 @@ def _prefetch_apple_podcasts(url, logger=None):
     Fetches the Apple Podcasts page directly and extracts metadata from the
     serialized-server-data JSON embedded in the HTML.
     """
-    import json
-    import re
-
     import requests as req
 
     if logger:
@@ -187,17 +220,7 @@ def _prefetch_apple_podcasts(url, logger=None):
     resp = req.get(url, timeout=30)
     resp.raise_for_status()
 
-    # Extract serialized-server-data JSON from the HTML
-    pattern = r'<script [^>]*\bid=["\']serialized-server-data["\'][^>]*>(.*?)</script>'
-    match = re.search(pattern, resp.text, re.DOTALL)
-    if not match:
-        raise ValueError('Could not find serialized-server-data in Apple Podcasts page')
-
-    raw = json.loads(match.group(1).strip())
-
-    # Navigate Apple's data structure:
-    # {"data": [{"intent": ..., "data": {"shelves": [...], "headerButtonItems": [...]}}]}
-    inner = raw['data'][0]['data']
+    inner = extract_apple_podcasts_data(resp.text)
 
     # Episode metadata from the first shelf (episodeHeaderRegular)
     episode = inner['shelves'][0]['items'][0]
@@ -245,14 +268,51 @@ def _prefetch_apple_podcasts(url, logger=None):
     return result
 
 
+# Bump when PrefetchResult/EntryInfo change incompatibly so old cache entries are ignored
+PREFETCH_CACHE_VERSION = 1
+
+
+def _prefetch_cache_key(url):
+    """Cache key for yt-dlp metadata of a URL (hashed so any URL is a valid key)."""
+    return f'prefetch:v{PREFETCH_CACHE_VERSION}:{hashlib.sha256(url.encode()).hexdigest()}'
+
+
+def invalidate_prefetch_cache(url):
+    """Drop cached yt-dlp metadata for a URL so the next prefetch re-extracts it."""
+    cache.delete(_prefetch_cache_key(url))
+
+
 def _prefetch_ytdlp(url, logger=None):
-    """Prefetch metadata using yt-dlp, with Apple Podcasts fallback."""
+    """
+    Prefetch metadata using yt-dlp, with Apple Podcasts fallback.
+
+    Results are cached per URL for STASHCAST_PREFETCH_CACHE_TTL seconds, so the
+    web request and the worker that both prefetch the same URL only extract once.
+    """
+    ttl = settings.STASHCAST_PREFETCH_CACHE_TTL
+    key = _prefetch_cache_key(url)
+
+    if ttl:
+        data = cache.get(key)
+        if data is not None:
+            # Cached as plain data rather than pickled dataclasses, so fields added
+            # later fall back to their defaults
+            entries = [EntryInfo(**entry) for entry in data.pop('entries', [])]
+            result = PrefetchResult(**data, entries=entries)
+            if logger:
+                logger(f'Using cached metadata: {result.title}')
+            return result
+
     try:
-        return _prefetch_ytdlp_inner(url, logger=logger)
+        result = _prefetch_ytdlp_inner(url, logger=logger)
     except Exception:
-        if _is_apple_podcasts_url(url):
-            return _prefetch_apple_podcasts(url, logger=logger)
-        raise
+        if not _is_apple_podcasts_url(url):
+            raise
+        result = _prefetch_apple_podcasts(url, logger=logger)
+
+    if ttl:
+        cache.set(key, asdict(result), ttl)
+    return result
 
 
 def _prefetch_ytdlp_inner(url, logger=None):
@@ -274,79 +334,100 @@ def _prefetch_ytdlp_inner(url, logger=None):
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         info = ydl.extract_info(url, download=False)
 
-        result = PrefetchResult()
-
-        # Check for playlist/multi-item result
-        if 'entries' in info:
-            entries_list = list(info.get('entries', []))
-            result.is_multiple = True
-            result.playlist_title = info.get('title', 'Untitled Playlist')
-
-            # Extract info for each entry
-            for entry in entries_list:
-                if entry is None:
-                    continue
-                # Determine the best URL for this entry
-                # For generic extractor with embedded media, 'url' is the direct media URL
-                # For platforms like YouTube, 'webpage_url' is the video page URL
-                entry_url = entry.get('url', '')
-                entry_webpage_url = entry.get('webpage_url', '')
-
-                # Prefer direct media URL if it ends with a media extension
-                if entry_url and any(entry_url.lower().endswith(ext) for ext in MEDIA_EXTENSIONS):
-                    best_url = entry_url
-                elif entry_webpage_url:
-                    best_url = entry_webpage_url
-                else:
-                    best_url = entry_url
-
-                entry_info = EntryInfo(
-                    url=best_url,
-                    title=entry.get('title', 'Untitled'),
-                    duration_seconds=entry.get('duration'),
-                    thumbnail_url=entry.get('thumbnail'),
-                )
-                result.entries.append(entry_info)
-
-            # Use playlist metadata for the result
-            result.title = result.playlist_title
-            result.description = info.get('description', '')
-            result.author = info.get('uploader', '') or info.get('channel', '')
-            result.extractor = info.get('extractor', '')
-            result.webpage_url = info.get('webpage_url', url)
-
-            if logger:
-                logger(f'Multi-item URL detected: {result.playlist_title}')
-                logger(f'Found {len(result.entries)} items')
-
-            return result
+    result = PrefetchResult()
 
-        # Single item result
-        result.title = info.get('title', 'Untitled')
+    # Check for playlist/multi-item result
+    if 'entries' in info:
+        entries_list = list(info.get('entries', []))
+        result.is_multiple = True
+        result.playlist_title = info.get('title', 'Untitled Playlist')
+
+        # Extract info for each entry
+        for entry in entries_list:
+            if entry is None:
+                continue
+            # Determine the best URL for this entry
+            # For generic extractor with embedded media, 'url' is the direct media URL
+            # For platforms like YouTube, 'webpage_url' is the video page URL
+            entry_url = entry.get('url', '')
+            entry_webpage_url = entry.get('webpage_url', '')
+
+            # Prefer direct media URL if it ends with a media extension
+            if entry_url and entry_url.lower().endswith(MEDIA_EXTENSION_SUFFIXES):
+                best_url = entry_url
+            elif entry_webpage_url:
+                best_url = entry_webpage_url
+            else:
+                best_url = entry_url
+
+            entry_info = EntryInfo(
+                url=best_url,
+                title=entry.get('title', 'Untitled'),
+                duration_seconds=entry.get('duration'),
+                thumbnail_url=entry.get('thumbnail'),
+            )
+            result.entries.append(entry_info)
+
+        # Use playlist metadata for the result
+        result.title = result.playlist_title
         result.description = info.get('description', '')
         result.author = info.get('uploader', '') or info.get('channel', '')
-        result.duration_seconds = info.get('duration')
         result.extractor = info.get('extractor', '')
-        result.external_id = info.get('id', '')
         result.webpage_url = info.get('webpage_url', url)
 
-        # Check for video/audio streams
-        formats = info.get('formats', [])
-        result.has_video_streams = any(f.get('vcodec') != 'none' for f in formats)
-        result.has_audio_streams = any(f.get('acodec') != 'none' for f in formats)
-
-        # Fallback: check top-level codec info (used by some extractors like ApplePodcasts)
-        if not result.has_video_streams and not result.has_audio_streams:
-            result.has_video_streams = info.get('vcodec') not in (None, 'none')
-            result.has_audio_streams = info.get('acodec') not in (None, 'none')
-
         if logger:
-            logger(f'yt-dlp metadata extracted: {result.title}')
-            logger(f'Extractor: {result.extractor}')
-            logger(f'Has video: {result.has_video_streams}, Has audio: {result.has_audio_streams}')
+            logger(f'Multi-item URL detected: {result.playlist_title}')
+            logger(f'Found {len(result.entries)} items')
 
         return result
 
+    # Single item result
+    result.title = info.get('title', 'Untitled')
+    result.description = info.get('description', '')
+    result.author = info.get('uploader', '') or info.get('channel', '')
+    result.duration_seconds = info.get('duration')
+    result.extractor = info.get('extractor', '')
+    result.external_id = info.get('id', '')
+    result.webpage_url = info.get('webpage_url', url)
+
+    # Check for video/audio streams. any() stops at the first matching format,
+    # so combined formats (listed first by most extractors) settle both checks early.
+    # Some extractors report 'formats': None, which is treated like no formats.
+    formats = info.get('formats') or []
+    result.has_video_streams = any(f.get('vcodec') != 'none' for f in formats)
+    result.has_audio_streams = any(f.get('acodec') != 'none' for f in formats)
+
+    # Fallback: check top-level codec info (used by some extractors like ApplePodcasts)
+    if not result.has_video_streams and not result.has_audio_streams:
+        result.has_video_streams = info.get('vcodec') not in (None, 'none')
+        result.has_audio_streams = info.get('acodec') not in (None, 'none')
+
+    if logger:
+        logger(f'yt-dlp metadata extracted: {result.title}')
+        logger(f'Extractor: {result.extractor}')
+        logger(f'Has video: {result.has_video_streams}, Has audio: {result.has_audio_streams}')
+
+    return result
+
+
+# (requested_type, has_video, has_audio) -> media type to download
+_MEDIA_TYPE_TABLE = MappingProxyType(
+    {
+        # Explicit requests always win
+        **{
+            (requested, has_video, has_audio): requested
+            for requested in ('audio', 'video')
+            for has_video in (False, True)
+            for has_audio in (False, True)
+        },
+        # Auto-detect: prefer video, then audio, default to video when ambiguous
+        ('auto', True, True): 'video',
+        ('auto', True, False): 'video',
+        ('auto', False, True): 'audio',
+        ('auto', False, False): 'video',
+    }
+)
+
 
 def resolve_media_type(requested_type, prefetch_result):
     """
@@ -359,25 +440,11 @@ def resolve_media_type(requested_type, prefetch_result):
     Returns:
         str: 'audio' or 'video'
     """
-    if requested_type in ['audio', 'video']:
-        # User explicitly requested a type
-        return requested_type
-
-    # Auto-detect based on available streams
-    if requested_type == 'auto':
-        if prefetch_result.has_video_streams:
-            return 'video'
-        elif prefetch_result.has_audio_streams:
-            return 'audio'
-        else:
-            # Ambiguous, default to video
-            return 'video'
-
-    # Invalid requested_type, default to auto behavior
-    if prefetch_result.has_video_streams:
-        return 'video'
-    else:
-        return 'audio'
+    has_video = bool(prefetch_result.has_video_streams)
+    key = (requested_type, has_video, bool(prefetch_result.has_audio_streams))
+
+    # Invalid requested_type: video if there are video streams, otherwise audio
+    return _MEDIA_TYPE_TABLE.get(key, 'video' if has_video else 'audio')
 
 
 def check_multiple_items(prefetch_result, allow_multiple=False, source='cli'):
@@ -25,6 +25,9 @@ SPOTIFY_SHOW_PATTERN = re.compile(r'https?://open\.spotify\.com/show/([a-zA-Z0-9
 SPOTIFY_TRACK_PATTERN = re.compile(r'https?://open\.spotify\.com/track/([a-zA-Z0-9]+)')
 SPOTIFY_ALBUM_PATTERN = re.compile(r'https?://open\.spotify\.com/album/([a-zA-Z0-9]+)')
 
+# Characters stripped from search queries (anything but word chars, whitespace and hyphens)
+SEARCH_QUERY_STRIP_PATTERN = re.compile(r'[^\w\s\-]')
+
 
 @dataclass
 class SpotifyMetadata:
@@ -464,11 +467,9 @@ def build_search_query(metadata: SpotifyMetadata) -> str:
 
     query = ' '.join(parts)
 
-    # Clean up the query - remove special characters that might interfere
-    query = re.sub(r'[^\w\s\-]', ' ', query)
-    query = re.sub(r'\s+', ' ', query).strip()
-
-    return query
+    # Clean up the query - remove special characters that might interfere,
+    # then collapse whitespace with split/join instead of a second regex pass
+    return ' '.join(SEARCH_QUERY_STRIP_PATTERN.sub(' ', query).split())
 
 
 def resolve_spotify_url(
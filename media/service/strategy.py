@@ -4,10 +4,11 @@ Download strategy detection.
 Determines whether to use direct HTTP download or yt-dlp for a given URL.
 """
 
+from functools import lru_cache
 from urllib.parse import urlparse
 from pathlib import Path
 
-from media.service.constants import MEDIA_EXTENSIONS
+from media.service.constants import MEDIA_EXTENSION_SUFFIXES
 from media.service.spotify import is_spotify_url
 
 
@@ -27,20 +28,29 @@ def choose_download_strategy(url):
     if is_spotify_url(url):
         return 'spotify'
 
-    # Check if it's a local file path
+    # Check if it's a local file path (URLs with a scheme never are, so skip the stat)
     file_path = Path(url)
-    if file_path.exists():
+    if '://' not in url and file_path.exists():
         # If it's an HTML file, treat it as content for yt-dlp to extract media from
         if file_path.suffix.lower() in ['.html', '.htm']:
             return 'ytdlp'
         # Otherwise, treat it as a direct media file
         return 'file'
 
-    parsed = urlparse(url)
-    path = parsed.path.lower()
+    return _classify_remote_url(url)
 
+
+@lru_cache(maxsize=4096)
+def _classify_remote_url(url):
+    """
+    Return 'direct' or 'ytdlp' for a URL that is not a local file.
+
+    This depends only on the URL string, so results are cached; the same URL is
+    classified several times per stash (API, prefetch, worker). The local file
+    check above touches the filesystem and stays uncached.
+    """
     # Check if URL path ends with a media extension
-    if any(path.endswith(ext) for ext in MEDIA_EXTENSIONS):
+    if urlparse(url).path.lower().endswith(MEDIA_EXTENSION_SUFFIXES):
         return 'direct'
 
     return 'ytdlp'
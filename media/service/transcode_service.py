@@ -100,7 +100,8 @@ def transcode_url_to_dir(
         TranscodeResult with details about the operation
 
     Raises:
-        PlaylistNotSupported: If URL is a playlist
+        MultipleItemsDetected: If URL is a playlist or other multi-item result
+        SpotifyUrlDetected: If URL is a Spotify URL (needs an alternative source)
         Exception: For other errors during processing
     """
     outdir = Path(outdir)
@@ -21,7 +21,7 @@ from media.progress_tracker import update_progress
 from media.service.config import get_ytdlp_args_for_type
 from media.service.download import prefetch_ytdlp_batch, download_ytdlp_batch
 from media.service.strategy import choose_download_strategy
-from media.utils import generate_slug, ensure_unique_slug
+from media.utils import generate_slug, ensure_unique_slug, get_ready_count
 
 
 def check_episode_limit():
@@ -32,7 +32,7 @@ def check_episode_limit():
     max_episodes = settings.STASHCAST_MAX_EPISODES
     if max_episodes <= 0:
         return None
-    current_count = MediaItem.objects.filter(status=MediaItem.STATUS_READY).count()
+    current_count = get_ready_count()
     if current_count >= max_episodes:
         return (
             f'Episode limit reached ({current_count}/{max_episodes}). '
@@ -2,18 +2,85 @@
 Tests for service/resolve.py
 """
 
-from unittest.mock import MagicMock, patch
+from types import MappingProxyType
+from unittest.mock import patch
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
 
 from media.service.resolve import (
+    EntryInfo,
     PrefetchResult,
+    extract_apple_podcasts_data,
+    invalidate_prefetch_cache,
     prefetch,
     resolve_media_type,
 )
 
+# Read-only yt-dlp info dicts shared by the prefetch tests. Nested lists are
+# never mutated by prefetch, so tests only need a shallow dict() copy.
+INFO_VIDEO = MappingProxyType(
+    {
+        'title': 'Test Video',
+        'description': 'Test description',
+        'uploader': 'Test Channel',
+        'duration': 120,
+        'extractor': 'youtube',
+        'id': 'abc123',
+        'webpage_url': 'https://youtube.com/watch?v=abc123',
+        'formats': [
+            {'vcodec': 'h264', 'acodec': 'aac'},
+            {'vcodec': 'none', 'acodec': 'opus'},
+        ],
+    }
+)
+
+INFO_AUDIO = MappingProxyType(
+    {
+        'title': 'Test Audio',
+        'formats': [
+            {'vcodec': 'none', 'acodec': 'opus'},
+        ],
+    }
+)
+
+INFO_PLAYLIST = MappingProxyType(
+    {
+        'title': 'Test Playlist',
+        'entries': [
+            {'title': 'Video 1', 'webpage_url': 'https://youtube.com/watch?v=abc1'},
+            {'title': 'Video 2', 'webpage_url': 'https://youtube.com/watch?v=abc2'},
+        ],
+    }
+)
+
+INFO_HTML_PAGE = MappingProxyType(
+    {
+        'title': 'Page with Embedded Media',
+        'entries': [
+            {
+                'title': 'Audio File',
+                'url': 'http://localhost:8001/audio.mp3',
+                'webpage_url': 'http://localhost:8001/page.html',
+            },
+            {
+                'title': 'Video File',
+                'url': 'http://localhost:8001/video.mp4',
+                'webpage_url': 'http://localhost:8001/page.html',
+            },
+        ],
+    }
+)
+
+
+def mock_extract_info(mock_ytdlp_class, info):
+    """Point the patched YoutubeDL at a mock instance returning a copy of info."""
+    mock_ydl = mock_ytdlp_class.return_value.__enter__.return_value
+    mock_ydl.extract_info.return_value = dict(info)
+    return mock_ydl
 
-class ResolveServiceTest(TestCase):
+
+class ResolveServiceTest(SimpleTestCase):
     """Tests for metadata extraction and type resolution"""
 
     def test_prefetch_result_dataclass(self):
@@ -91,22 +158,7 @@ class ResolveServiceTest(TestCase):
     @patch('media.service.resolve.yt_dlp.YoutubeDL')
     def test_prefetch_ytdlp_success(self, mock_ytdlp_class):
         """Test successful yt-dlp metadata extraction"""
-        # Mock the yt-dlp info extraction
-        mock_ydl = MagicMock()
-        mock_ytdlp_class.return_value.__enter__.return_value = mock_ydl
-        mock_ydl.extract_info.return_value = {
-            'title': 'Test Video',
-            'description': 'Test description',
-            'uploader': 'Test Channel',
-            'duration': 120,
-            'extractor': 'youtube',
-            'id': 'abc123',
-            'webpage_url': 'https://youtube.com/watch?v=abc123',
-            'formats': [
-                {'vcodec': 'h264', 'acodec': 'aac'},
-                {'vcodec': 'none', 'acodec': 'opus'},
-            ],
-        }
+        mock_extract_info(mock_ytdlp_class, INFO_VIDEO)
 
         url = 'https://youtube.com/watch?v=abc123'
         result = prefetch(url, 'ytdlp')
@@ -122,14 +174,7 @@ class ResolveServiceTest(TestCase):
     @patch('media.service.resolve.yt_dlp.YoutubeDL')
     def test_prefetch_ytdlp_audio_only(self, mock_ytdlp_class):
         """Test yt-dlp extraction for audio-only content"""
-        mock_ydl = MagicMock()
-        mock_ytdlp_class.return_value.__enter__.return_value = mock_ydl
-        mock_ydl.extract_info.return_value = {
-            'title': 'Test Audio',
-            'formats': [
-                {'vcodec': 'none', 'acodec': 'opus'},
-            ],
-        }
+        mock_extract_info(mock_ytdlp_class, INFO_AUDIO)
 
         url = 'https://example.com/audio'
         result = prefetch(url, 'ytdlp')
@@ -137,18 +182,23 @@ class ResolveServiceTest(TestCase):
         self.assertFalse(result.has_video_streams)
         self.assertTrue(result.has_audio_streams)
 
+    @patch('media.service.resolve.yt_dlp.YoutubeDL')
+    def test_prefetch_ytdlp_null_formats_uses_top_level_codecs(self, mock_ytdlp_class):
+        """Test 'formats': None falls back to top-level codec info"""
+        mock_extract_info(
+            mock_ytdlp_class,
+            {'title': 'Episode', 'formats': None, 'vcodec': 'none', 'acodec': 'mp3'},
+        )
+
+        result = prefetch('https://example.com/episode', 'ytdlp')
+
+        self.assertFalse(result.has_video_streams)
+        self.assertTrue(result.has_audio_streams)
+
     @patch('media.service.resolve.yt_dlp.YoutubeDL')
     def test_prefetch_ytdlp_playlist_returns_multiple(self, mock_ytdlp_class):
         """Test that playlists return is_multiple=True with entries"""
-        mock_ydl = MagicMock()
-        mock_ytdlp_class.return_value.__enter__.return_value = mock_ydl
-        mock_ydl.extract_info.return_value = {
-            'title': 'Test Playlist',
-            'entries': [
-                {'title': 'Video 1', 'webpage_url': 'https://youtube.com/watch?v=abc1'},
-                {'title': 'Video 2', 'webpage_url': 'https://youtube.com/watch?v=abc2'},
-            ],
-        }
+        mock_extract_info(mock_ytdlp_class, INFO_PLAYLIST)
 
         url = 'https://youtube.com/playlist?list=abc123'
 
@@ -167,23 +217,7 @@ class ResolveServiceTest(TestCase):
         from HTML pages to resolve to the same parent page URL instead of the actual
         media URLs.
         """
-        mock_ydl = MagicMock()
-        mock_ytdlp_class.return_value.__enter__.return_value = mock_ydl
-        mock_ydl.extract_info.return_value = {
-            'title': 'Page with Embedded Media',
-            'entries': [
-                {
-                    'title': 'Audio File',
-                    'url': 'http://localhost:8001/audio.mp3',
-                    'webpage_url': 'http://localhost:8001/page.html',
-                },
-                {
-                    'title': 'Video File',
-                    'url': 'http://localhost:8001/video.mp4',
-                    'webpage_url': 'http://localhost:8001/page.html',
-                },
-            ],
-        }
+        mock_extract_info(mock_ytdlp_class, INFO_HTML_PAGE)
 
         url = 'http://localhost:8001/page.html'
         result = prefetch(url, 'ytdlp')
@@ -261,7 +295,90 @@ class ResolveServiceTest(TestCase):
         media_type = resolve_media_type('invalid', result)
         self.assertEqual(media_type, 'audio')
 
+    def test_resolve_media_type_invalid_no_streams_defaults_to_audio(self):
+        """Test invalid type without any stream info falls back to audio"""
+        result = PrefetchResult()
+
+        media_type = resolve_media_type('invalid', result)
+        self.assertEqual(media_type, 'audio')
+
+    def test_extract_apple_podcasts_data(self):
+        """Test the serialized-server-data payload is pulled out of an Apple page"""
+        html = (
+            '<html><head></head><body>'
+            '<script type="application/json" id="serialized-server-data">'
+            '{"data": [{"data": {"shelves": [], "headerButtonItems": []}}]}'
+            '</script></body></html>'
+        )
+
+        inner = extract_apple_podcasts_data(html)
+
+        self.assertEqual(inner, {'shelves': [], 'headerButtonItems': []})
+
+    def test_extract_apple_podcasts_data_missing(self):
+        """Test pages without serialized-server-data raise ValueError"""
+        with self.assertRaises(ValueError):
+            extract_apple_podcasts_data('<html><body>No data here</body></html>')
+
     def test_prefetch_invalid_strategy(self):
         """Test that invalid strategy raises ValueError"""
         with self.assertRaises(ValueError):
             prefetch('https://example.com', 'invalid_strategy')
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    STASHCAST_PREFETCH_CACHE_TTL=60,
+)
+class PrefetchCacheTest(SimpleTestCase):
+    """Tests for caching yt-dlp metadata between prefetch calls"""
+
+    url = 'https://youtube.com/watch?v=cached'
+
+    def setUp(self):
+        cache.clear()
+
+    @patch('media.service.resolve.yt_dlp.YoutubeDL')
+    def test_second_prefetch_served_from_cache(self, mock_ytdlp_class):
+        """Test repeat prefetch of the same URL skips yt-dlp"""
+        mock_ydl = mock_extract_info(mock_ytdlp_class, INFO_VIDEO)
+
+        first = prefetch(self.url, 'ytdlp')
+        second = prefetch(self.url, 'ytdlp')
+
+        self.assertEqual(mock_ydl.extract_info.call_count, 1)
+        self.assertEqual(second, first)
+
+    @patch('media.service.resolve.yt_dlp.YoutubeDL')
+    def test_cached_playlist_rebuilds_entries(self, mock_ytdlp_class):
+        """Test cached playlist metadata comes back with EntryInfo entries"""
+        mock_ydl = mock_extract_info(mock_ytdlp_class, INFO_PLAYLIST)
+
+        first = prefetch(self.url, 'ytdlp')
+        second = prefetch(self.url, 'ytdlp')
+
+        self.assertEqual(mock_ydl.extract_info.call_count, 1)
+        self.assertEqual(second, first)
+        self.assertIsInstance(second.entries[0], EntryInfo)
+
+    @patch('media.service.resolve.yt_dlp.YoutubeDL')
+    def test_invalidate_forces_refetch(self, mock_ytdlp_class):
+        """Test invalidate_prefetch_cache makes the next prefetch hit yt-dlp again"""
+        mock_ydl = mock_extract_info(mock_ytdlp_class, INFO_VIDEO)
+
+        prefetch(self.url, 'ytdlp')
+        invalidate_prefetch_cache(self.url)
+        prefetch(self.url, 'ytdlp')
+
+        self.assertEqual(mock_ydl.extract_info.call_count, 2)
+
+    @override_settings(STASHCAST_PREFETCH_CACHE_TTL=0)
+    @patch('media.service.resolve.yt_dlp.YoutubeDL')
+    def test_zero_ttl_disables_cache(self, mock_ytdlp_class):
+        """Test STASHCAST_PREFETCH_CACHE_TTL=0 always calls yt-dlp"""
+        mock_ydl = mock_extract_info(mock_ytdlp_class, INFO_VIDEO)
+
+        prefetch(self.url, 'ytdlp')
+        prefetch(self.url, 'ytdlp')
+
+        self.assertEqual(mock_ydl.extract_info.call_count, 2)
@@ -2,7 +2,7 @@
 Tests for service/spotify.py
 """
 
-from django.test import TestCase
+from django.test import SimpleTestCase
 
 from media.service.spotify import (
     is_spotify_url,
@@ -13,7 +13,7 @@ from media.service.spotify import (
 )
 
 
-class SpotifyUrlDetectionTest(TestCase):
+class SpotifyUrlDetectionTest(SimpleTestCase):
     """Tests for Spotify URL detection"""
 
     def test_is_spotify_url_episode(self):
@@ -47,7 +47,7 @@ class SpotifyUrlDetectionTest(TestCase):
             self.assertFalse(is_spotify_url(url))
 
 
-class SpotifyTypeDetectionTest(TestCase):
+class SpotifyTypeDetectionTest(SimpleTestCase):
     """Tests for Spotify content type detection"""
 
     def test_get_spotify_type_episode(self):
@@ -76,7 +76,7 @@ class SpotifyTypeDetectionTest(TestCase):
         self.assertIsNone(get_spotify_type(url))
 
 
-class SpotifyIdExtractionTest(TestCase):
+class SpotifyIdExtractionTest(SimpleTestCase):
     """Tests for Spotify ID extraction"""
 
     def test_get_spotify_id_episode(self):
@@ -95,7 +95,7 @@ class SpotifyIdExtractionTest(TestCase):
         self.assertEqual(get_spotify_id(url), '4cOdK2wGLETKBW3PvgPWqT')
 
 
-class SearchQueryBuildingTest(TestCase):
+class SearchQueryBuildingTest(SimpleTestCase):
     """Tests for YouTube search query building"""
 
     def test_build_search_query_episode(self):
@@ -168,7 +168,7 @@ class SearchQueryBuildingTest(TestCase):
         self.assertNotIn(')', query)
 
 
-class StrategyIntegrationTest(TestCase):
+class StrategyIntegrationTest(SimpleTestCase):
     """Tests for Spotify strategy in choose_download_strategy"""
 
     def test_spotify_url_returns_spotify_strategy(self):
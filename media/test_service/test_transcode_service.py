@@ -4,13 +4,18 @@ Tests for service/transcode_service.py
 Integration tests for the main transcode service entrypoint.
 """
 
-import io
+import contextlib
+import dataclasses
+import functools
+import os
 import tempfile
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import DEFAULT, patch
 
-from django.test import TestCase
+from django.test import SimpleTestCase
 
+from media.service.download import DownloadedFileInfo
+from media.service.process import ProcessedFileInfo
 from media.service.resolve import (
     MultipleItemsDetected,
     PrefetchResult,
@@ -19,12 +24,89 @@ from media.service.resolve import (
 from media.service.transcode_service import TranscodeResult, transcode_url_to_dir
 
 
-class TranscodeServiceTest(TestCase):
+# Prefer the Linux RAM disk for scratch files; fall back to the default temp dir
+_SCRATCH_DIR = '/dev/shm' if os.access('/dev/shm', os.W_OK) else None
+
+
+def _dl(path, size=0, ext='.mp3', **kwargs):
+    """Build the DownloadedFileInfo a mocked download returns"""
+    return DownloadedFileInfo(path=path, file_size=size, extension=ext, **kwargs)
+
+
+def _touch_download(url, out_path, logger=None, ext='.mp3', **fields):
+    """download_direct side effect: create an empty file at out_path"""
+    out_path.touch()
+    return _dl(out_path, ext=ext, **fields)
+
+
+def _touch_ytdlp_download(url, resolved_type, temp_dir, **kwargs):
+    """download_ytdlp side effect: create an empty MP4 in temp_dir"""
+    content_file = temp_dir / 'download.mp4'
+    content_file.touch()
+    return _dl(content_file, ext='.mp4')
+
+
+def _touch_output(input_path, output_path, **kwargs):
+    """Processing side effect (metadata, thumbnail, subtitle): create output_path"""
+    output_path.touch()
+    return output_path
+
+
+class _NullIO:
+    """Write-only stream that discards everything"""
+
+    def write(self, s):
+        return len(s)
+
+    def flush(self):
+        pass
+
+
+class TranscodeServiceTest(SimpleTestCase):
     """Integration tests for transcode service"""
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Built once; tests take a copy with a fresh entries list and override the fields they need
+        cls.base_prefetch = PrefetchResult(title='test')
+        # One scratch root per class; tests needing output get a subdirectory via temp_dir
+        cls._tmp_root = tempfile.TemporaryDirectory(dir=_SCRATCH_DIR)
+        cls._null_stdout = _NullIO()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp_root.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        # Patch the service collaborators every test stubs out in one pass
+        self.mocks = patch.multiple(
+            'media.service.transcode_service',
+            choose_download_strategy=DEFAULT,
+            prefetch=DEFAULT,
+            download_direct=DEFAULT,
+            download_ytdlp=DEFAULT,
+            needs_transcode=DEFAULT,
+            transcode_to_playable=DEFAULT,
+            process_thumbnail=DEFAULT,
+            process_subtitle=DEFAULT,
+        ).start()
+        self.addCleanup(patch.stopall)
+
+    @functools.cached_property
+    def temp_dir(self):
+        """Per-test output directory, created on first use"""
+        return tempfile.mkdtemp(dir=self._tmp_root.name)
+
+    def _prefetch_result(self, **fields):
+        """Return a copy of the shared PrefetchResult with fields overridden"""
+        # A fresh entries list so no test can mutate the one on base_prefetch
+        return dataclasses.replace(self.base_prefetch, **{'entries': [], **fields})
+
     def _suppress_stdout(self):
         """Context manager to suppress stdout during tests"""
-        return patch('sys.stdout', new_callable=io.StringIO)
+        return contextlib.redirect_stdout(self._null_stdout)
 
     def test_transcode_result_dataclass(self):
         """Test TranscodeResult dataclass"""
@@ -44,445 +126,232 @@ class TranscodeServiceTest(TestCase):
         self.assertEqual(result.strategy, 'direct')
         self.assertFalse(result.transcoded)
 
-    @patch('media.service.transcode_service.needs_transcode')
-    @patch('media.service.transcode_service.download_direct')
-    @patch('media.service.transcode_service.prefetch')
-    @patch('media.service.transcode_service.choose_download_strategy')
-    def test_transcode_direct_mp3_no_transcoding(
-        self, mock_strategy, mock_prefetch, mock_download, mock_needs_transcode
-    ):
+    def test_transcode_direct_mp3_no_transcoding(self):
         """Test direct MP3 download without transcoding"""
         # Setup mocks
-        mock_strategy.return_value = 'direct'
-        mock_needs_transcode.return_value = False  # MP3 doesn't need transcoding
-
-        from media.service.resolve import PrefetchResult
+        self.mocks['choose_download_strategy'].return_value = 'direct'
+        self.mocks['needs_transcode'].return_value = False  # MP3 doesn't need transcoding
 
-        prefetch_result = PrefetchResult()
-        prefetch_result.title = 'test audio'
-        prefetch_result.has_audio_streams = True
-        prefetch_result.has_video_streams = False
-        mock_prefetch.return_value = prefetch_result
+        self.mocks['prefetch'].return_value = self._prefetch_result(
+            title='test audio', has_audio_streams=True, has_video_streams=False
+        )
 
         # Mock download to create a fake file
-        def mock_download_func(url, out_path, logger=None):
-            out_path = Path(out_path)
-            out_path.write_bytes(b'fake mp3 data')
-            from media.service.download import DownloadedFileInfo
-
-            return DownloadedFileInfo(
-                path=out_path,
-                file_size=len(b'fake mp3 data'),
-                extension='.mp3',
-                mime_type='audio/mpeg',
-            )
-
-        mock_download.side_effect = mock_download_func
+        self.mocks['download_direct'].side_effect = functools.partial(
+            _touch_download, mime_type='audio/mpeg'
+        )
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = transcode_url_to_dir(
-                url='https://example.com/audio.mp3',
-                outdir=temp_dir,
-                requested_type='auto',
-            )
+        result = transcode_url_to_dir(
+            url='https://example.com/audio.mp3',
+            outdir=self.temp_dir,
+            requested_type='auto',
+        )
 
-            # Verify result
-            self.assertEqual(result.strategy, 'direct')
-            self.assertEqual(result.resolved_type, 'audio')
-            self.assertFalse(result.transcoded)
-            self.assertTrue(result.output_path.exists())
-            self.assertEqual(result.output_path.name, 'test-audio.mp3')
+        # Verify result
+        self.assertEqual(result.strategy, 'direct')
+        self.assertEqual(result.resolved_type, 'audio')
+        self.assertFalse(result.transcoded)
+        self.assertTrue(result.output_path.exists())
+        self.assertEqual(result.output_path.name, 'test-audio.mp3')
 
     @patch(
         'media.service.transcode_service.resolve_title_from_metadata',
         return_value='Real Title',
     )
     @patch('media.service.transcode_service.add_metadata_without_transcode')
-    @patch('media.service.transcode_service.needs_transcode', return_value=False)
-    @patch('media.service.transcode_service.download_direct')
-    @patch('media.service.transcode_service.prefetch')
-    @patch('media.service.transcode_service.choose_download_strategy')
-    def test_transcode_updates_title_from_metadata(
-        self,
-        mock_strategy,
-        mock_prefetch,
-        mock_download,
-        _mock_needs_transcode,
-        mock_add_metadata,
-        _mock_title,
-    ):
+    def test_transcode_updates_title_from_metadata(self, mock_add_metadata, _mock_title):
         """Test transcode updates title/slug when prefetch title is generic."""
-        mock_strategy.return_value = 'direct'
+        self.mocks['choose_download_strategy'].return_value = 'direct'
+        self.mocks['needs_transcode'].return_value = False
 
-        from media.service.resolve import PrefetchResult
-
-        prefetch_result = PrefetchResult()
-        prefetch_result.title = 'content'
-        prefetch_result.has_audio_streams = True
-        prefetch_result.file_extension = '.mp3'
-        mock_prefetch.return_value = prefetch_result
-
-        def mock_download_func(url, out_path, logger=None):
-            out_path = Path(out_path)
-            out_path.write_bytes(b'fake mp3 data')
-            from media.service.download import DownloadedFileInfo
-
-            return DownloadedFileInfo(
-                path=out_path,
-                file_size=len(b'fake mp3 data'),
-                extension='.mp3',
-                mime_type='audio/mpeg',
-            )
-
-        def mock_add_metadata_func(input_path, output_path, metadata=None, logger=None):
-            output_path = Path(output_path)
-            output_path.write_bytes(b'output data')
-
-        mock_download.side_effect = mock_download_func
-        mock_add_metadata.side_effect = mock_add_metadata_func
+        self.mocks['prefetch'].return_value = self._prefetch_result(
+            title='content', has_audio_streams=True, file_extension='.mp3'
+        )
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = transcode_url_to_dir(
-                url='https://example.com/audio.mp3',
-                outdir=temp_dir,
-                requested_type='auto',
-            )
+        self.mocks['download_direct'].side_effect = functools.partial(
+            _touch_download, mime_type='audio/mpeg'
+        )
+        mock_add_metadata.side_effect = _touch_output
 
-            self.assertEqual(result.title, 'Real Title')
-            self.assertEqual(result.slug, 'real-title')
-            self.assertEqual(result.output_path.name, 'real-title.mp3')
-
-    @patch('media.service.transcode_service.needs_transcode')
-    @patch('media.service.transcode_service.download_direct')
-    @patch('media.service.transcode_service.prefetch')
-    @patch('media.service.transcode_service.choose_download_strategy')
-    def test_transcode_download_only(
-        self, mock_strategy, mock_prefetch, mock_download, mock_needs_transcode
-    ):
-        """Test download_only flag skips transcoding"""
-        mock_strategy.return_value = 'direct'
-        mock_needs_transcode.return_value = (
-            True  # Would need transcoding but download_only prevents it
+        result = transcode_url_to_dir(
+            url='https://example.com/audio.mp3',
+            outdir=self.temp_dir,
+            requested_type='auto',
         )
 
-        from media.service.resolve import PrefetchResult
+        self.assertEqual(result.title, 'Real Title')
+        self.assertEqual(result.slug, 'real-title')
+        self.assertEqual(result.output_path.name, 'real-title.mp3')
 
-        prefetch_result = PrefetchResult()
-        prefetch_result.title = 'test'
-        prefetch_result.has_audio_streams = True
-        prefetch_result.file_extension = '.ogg'
-        mock_prefetch.return_value = prefetch_result
+    def test_transcode_download_only(self):
+        """Test download_only flag skips transcoding"""
+        self.mocks['choose_download_strategy'].return_value = 'direct'
+        # Would need transcoding but download_only prevents it
+        self.mocks['needs_transcode'].return_value = True
 
-        def mock_download_func(url, out_path, logger=None):
-            out_path = Path(out_path)
-            out_path.write_bytes(b'ogg data')
-            from media.service.download import DownloadedFileInfo
+        self.mocks['prefetch'].return_value = self._prefetch_result(
+            has_audio_streams=True, file_extension='.ogg'
+        )
 
-            return DownloadedFileInfo(path=out_path, file_size=8, extension='.ogg')
+        self.mocks['download_direct'].side_effect = functools.partial(_touch_download, ext='.ogg')
 
-        mock_download.side_effect = mock_download_func
+        result = transcode_url_to_dir(
+            url='https://example.com/audio.ogg', outdir=self.temp_dir, download_only=True
+        )
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = transcode_url_to_dir(
-                url='https://example.com/audio.ogg', outdir=temp_dir, download_only=True
-            )
+        # Should keep OGG format (no transcoding)
+        self.assertFalse(result.transcoded)
+        self.assertEqual(result.output_path.suffix, '.ogg')
 
-            # Should keep OGG format (no transcoding)
-            self.assertFalse(result.transcoded)
-            self.assertEqual(result.output_path.suffix, '.ogg')
-
-    @patch('media.service.transcode_service.transcode_to_playable')
-    @patch('media.service.transcode_service.needs_transcode')
-    @patch('media.service.transcode_service.download_direct')
-    @patch('media.service.transcode_service.prefetch')
-    @patch('media.service.transcode_service.choose_download_strategy')
-    def test_transcode_ogg_to_m4a(
-        self,
-        mock_strategy,
-        mock_prefetch,
-        mock_download,
-        mock_needs_transcode,
-        mock_transcode,
-    ):
+    def test_transcode_ogg_to_m4a(self):
         """Test OGG audio transcoding to M4A"""
-        mock_strategy.return_value = 'direct'
+        self.mocks['choose_download_strategy'].return_value = 'direct'
 
-        from media.service.resolve import PrefetchResult
+        self.mocks['prefetch'].return_value = self._prefetch_result(has_audio_streams=True)
 
-        prefetch_result = PrefetchResult()
-        prefetch_result.title = 'test'
-        prefetch_result.has_audio_streams = True
-        mock_prefetch.return_value = prefetch_result
+        self.mocks['download_direct'].side_effect = functools.partial(_touch_download, ext='.ogg')
 
-        def mock_download_func(url, out_path, logger=None):
-            out_path = Path(out_path)
-            out_path.write_bytes(b'ogg data')
-            from media.service.download import DownloadedFileInfo
-
-            return DownloadedFileInfo(path=out_path, file_size=8, extension='.ogg')
-
-        mock_download.side_effect = mock_download_func
-
-        mock_needs_transcode.return_value = True
+        self.mocks['needs_transcode'].return_value = True
 
         def mock_transcode_func(input_path, resolved_type, output_path, **kwargs):
-            output_path = Path(output_path)
-            output_path.write_bytes(b'transcoded m4a data')
-            from media.service.process import ProcessedFileInfo
+            output_path.touch()
 
             return ProcessedFileInfo(
-                path=output_path, file_size=19, extension='.m4a', was_transcoded=True
+                path=output_path, file_size=0, extension='.m4a', was_transcoded=True
             )
 
-        mock_transcode.side_effect = mock_transcode_func
+        self.mocks['transcode_to_playable'].side_effect = mock_transcode_func
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = transcode_url_to_dir(url='https://example.com/audio.ogg', outdir=temp_dir)
+        result = transcode_url_to_dir(url='https://example.com/audio.ogg', outdir=self.temp_dir)
 
-            # Should be transcoded to M4A
-            self.assertTrue(result.transcoded)
-            self.assertEqual(result.output_path.suffix, '.m4a')
-            self.assertTrue(result.output_path.exists())
+        # Should be transcoded to M4A
+        self.assertTrue(result.transcoded)
+        self.assertEqual(result.output_path.suffix, '.m4a')
+        self.assertTrue(result.output_path.exists())
 
-    @patch('media.service.transcode_service.needs_transcode')
-    @patch('media.service.transcode_service.download_ytdlp')
-    @patch('media.service.transcode_service.prefetch')
-    @patch('media.service.transcode_service.choose_download_strategy')
-    def test_transcode_ytdlp_strategy(
-        self, mock_strategy, mock_prefetch, mock_download_ytdlp, mock_needs_transcode
-    ):
+    def test_transcode_ytdlp_strategy(self):
         """Test yt-dlp download strategy"""
-        mock_strategy.return_value = 'ytdlp'
-        mock_needs_transcode.return_value = False  # MP4 doesn't need transcoding
+        self.mocks['choose_download_strategy'].return_value = 'ytdlp'
+        self.mocks['needs_transcode'].return_value = False  # MP4 doesn't need transcoding
 
-        from media.service.resolve import PrefetchResult
+        self.mocks['prefetch'].return_value = self._prefetch_result(
+            title='YouTube Video', has_video_streams=True
+        )
 
-        prefetch_result = PrefetchResult()
-        prefetch_result.title = 'YouTube Video'
-        prefetch_result.has_video_streams = True
-        mock_prefetch.return_value = prefetch_result
+        self.mocks['download_ytdlp'].side_effect = _touch_ytdlp_download
 
-        def mock_ytdlp_download_func(url, resolved_type, temp_dir, **kwargs):
-            # Create a fake downloaded file in the temp_dir
-            temp_dir = Path(temp_dir)
-            content_file = temp_dir / 'download.mp4'
-            content_file.write_bytes(b'youtube video data')
-
-            from media.service.download import DownloadedFileInfo
-
-            return DownloadedFileInfo(path=content_file, file_size=18, extension='.mp4')
-
-        mock_download_ytdlp.side_effect = mock_ytdlp_download_func
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = transcode_url_to_dir(url='https://youtube.com/watch?v=abc123', outdir=temp_dir)
-
-            # Verify yt-dlp was used
-            self.assertEqual(result.strategy, 'ytdlp')
-            mock_download_ytdlp.assert_called_once()
-
-    @patch('media.service.transcode_service.needs_transcode')
-    @patch('media.service.transcode_service.process_thumbnail')
-    @patch('media.service.transcode_service.download_ytdlp')
-    @patch('media.service.transcode_service.prefetch')
-    @patch('media.service.transcode_service.choose_download_strategy')
-    def test_transcode_with_thumbnail(
-        self,
-        mock_strategy,
-        mock_prefetch,
-        mock_download_ytdlp,
-        mock_process_thumb,
-        mock_needs_transcode,
-    ):
-        """Test that thumbnails are processed"""
-        mock_strategy.return_value = 'ytdlp'
-        mock_needs_transcode.return_value = False
+        result = transcode_url_to_dir(
+            url='https://youtube.com/watch?v=abc123', outdir=self.temp_dir
+        )
 
-        from media.service.resolve import PrefetchResult
+        # Verify yt-dlp was used
+        self.assertEqual(result.strategy, 'ytdlp')
+        self.mocks['download_ytdlp'].assert_called_once()
+
+    def test_transcode_with_thumbnail(self):
+        """Test that thumbnails are processed"""
+        self.mocks['choose_download_strategy'].return_value = 'ytdlp'
+        self.mocks['needs_transcode'].return_value = False
 
-        prefetch_result = PrefetchResult()
-        prefetch_result.title = 'test'
-        prefetch_result.has_video_streams = True
-        mock_prefetch.return_value = prefetch_result
+        self.mocks['prefetch'].return_value = self._prefetch_result(has_video_streams=True)
 
         def mock_ytdlp_download_func(url, resolved_type, temp_dir, **kwargs):
-            temp_dir = Path(temp_dir)
             content_file = temp_dir / 'download.mp4'
-            content_file.write_bytes(b'video')
+            content_file.touch()
             thumb_file = temp_dir / 'thumbnail.jpg'
-            thumb_file.write_bytes(b'thumbnail')
+            thumb_file.touch()
 
-            from media.service.download import DownloadedFileInfo
+            return _dl(content_file, ext='.mp4', thumbnail_path=thumb_file)
 
-            return DownloadedFileInfo(
-                path=content_file,
-                file_size=5,
-                extension='.mp4',
-                thumbnail_path=thumb_file,
-            )
+        self.mocks['download_ytdlp'].side_effect = mock_ytdlp_download_func
 
-        mock_download_ytdlp.side_effect = mock_ytdlp_download_func
-
-        def mock_process_thumb_func(thumb_path, output_path, **kwargs):
-            output_path = Path(output_path)
-            output_path.write_bytes(b'png')
-            return output_path
-
-        mock_process_thumb.side_effect = mock_process_thumb_func
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = transcode_url_to_dir(url='https://youtube.com/watch?v=abc123', outdir=temp_dir)
-
-            # Verify thumbnail was processed
-            mock_process_thumb.assert_called_once()
-            self.assertIsNotNone(result.thumbnail_path)
-
-    @patch('media.service.transcode_service.needs_transcode')
-    @patch('media.service.transcode_service.process_subtitle')
-    @patch('media.service.transcode_service.download_ytdlp')
-    @patch('media.service.transcode_service.prefetch')
-    @patch('media.service.transcode_service.choose_download_strategy')
-    def test_transcode_with_subtitle(
-        self,
-        mock_strategy,
-        mock_prefetch,
-        mock_download_ytdlp,
-        mock_process_sub,
-        mock_needs_transcode,
-    ):
-        """Test that subtitles are processed"""
-        mock_strategy.return_value = 'ytdlp'
-        mock_needs_transcode.return_value = False
+        self.mocks['process_thumbnail'].side_effect = _touch_output
+
+        result = transcode_url_to_dir(
+            url='https://youtube.com/watch?v=abc123', outdir=self.temp_dir
+        )
+
+        # Verify thumbnail was processed
+        self.mocks['process_thumbnail'].assert_called_once()
+        self.assertIsNotNone(result.thumbnail_path)
 
-        from media.service.resolve import PrefetchResult
+    def test_transcode_with_subtitle(self):
+        """Test that subtitles are processed"""
+        self.mocks['choose_download_strategy'].return_value = 'ytdlp'
+        self.mocks['needs_transcode'].return_value = False
 
-        prefetch_result = PrefetchResult()
-        prefetch_result.title = 'test'
-        prefetch_result.has_video_streams = True
-        mock_prefetch.return_value = prefetch_result
+        self.mocks['prefetch'].return_value = self._prefetch_result(has_video_streams=True)
 
         def mock_ytdlp_download_func(url, resolved_type, temp_dir, **kwargs):
-            temp_dir = Path(temp_dir)
             content_file = temp_dir / 'download.mp4'
-            content_file.write_bytes(b'video')
+            content_file.touch()
             sub_file = temp_dir / 'subtitle.vtt'
-            sub_file.write_bytes(b'WEBVTT')
+            sub_file.touch()
 
-            from media.service.download import DownloadedFileInfo
+            return _dl(content_file, ext='.mp4', subtitle_path=sub_file)
 
-            return DownloadedFileInfo(
-                path=content_file, file_size=5, extension='.mp4', subtitle_path=sub_file
-            )
+        self.mocks['download_ytdlp'].side_effect = mock_ytdlp_download_func
 
-        mock_download_ytdlp.side_effect = mock_ytdlp_download_func
+        self.mocks['process_subtitle'].side_effect = _touch_output
 
-        def mock_process_sub_func(sub_path, output_path, **kwargs):
-            output_path = Path(output_path)
-            output_path.write_bytes(b'WEBVTT')
-            return output_path
-
-        mock_process_sub.side_effect = mock_process_sub_func
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = transcode_url_to_dir(url='https://youtube.com/watch?v=abc123', outdir=temp_dir)
+        result = transcode_url_to_dir(
+            url='https://youtube.com/watch?v=abc123', outdir=self.temp_dir
+        )
 
-            # Verify subtitle was processed
-            mock_process_sub.assert_called_once()
-            self.assertIsNotNone(result.subtitle_path)
+        # Verify subtitle was processed
+        self.mocks['process_subtitle'].assert_called_once()
+        self.assertIsNotNone(result.subtitle_path)
 
     @patch('media.service.transcode_service.add_metadata_without_transcode')
-    @patch('media.service.transcode_service.needs_transcode')
-    def test_transcode_verbose_logging(self, mock_needs_transcode, mock_add_metadata):
+    def test_transcode_verbose_logging(self, mock_add_metadata):
         """Test that verbose mode produces logs"""
-        mock_needs_transcode.return_value = False
+        self.mocks['needs_transcode'].return_value = False
+        self.mocks['choose_download_strategy'].return_value = 'direct'
+        self.mocks['prefetch'].return_value = self._prefetch_result(has_audio_streams=True)
 
-        with patch('media.service.transcode_service.choose_download_strategy') as mock_strategy:
-            mock_strategy.return_value = 'direct'
-
-            with patch('media.service.transcode_service.prefetch') as mock_prefetch:
-                from media.service.resolve import PrefetchResult
-
-                prefetch_result = PrefetchResult()
-                prefetch_result.title = 'test'
-                prefetch_result.has_audio_streams = True
-                mock_prefetch.return_value = prefetch_result
-
-                with patch('media.service.transcode_service.download_direct') as mock_download:
-
-                    def mock_download_func(url, out_path, logger=None):
-                        # Verify logger is passed
-                        self.assertIsNotNone(logger)
-                        logger('Test log message')
-
-                        out_path = Path(out_path)
-                        out_path.write_bytes(b'data')
-                        from media.service.download import DownloadedFileInfo
-
-                        return DownloadedFileInfo(path=out_path, file_size=4, extension='.mp3')
-
-                    mock_download.side_effect = mock_download_func
-
-                    def mock_metadata_func(input_path, output_path, metadata=None, logger=None):
-                        # Just copy the file
-                        output_path = Path(output_path)
-                        output_path.write_bytes(input_path.read_bytes())
-
-                    mock_add_metadata.side_effect = mock_metadata_func
-
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        # Suppress stdout to prevent leaked output during tests
-                        with self._suppress_stdout():
-                            # This should pass logger to download functions
-                            transcode_url_to_dir(
-                                url='https://example.com/audio.mp3',
-                                outdir=temp_dir,
-                                verbose=True,
-                            )
+        def mock_download_func(url, out_path, logger=None):
+            # Verify logger is passed
+            self.assertIsNotNone(logger)
+            logger('Test log message')
+            return _touch_download(url, out_path)
+
+        self.mocks['download_direct'].side_effect = mock_download_func
+        mock_add_metadata.side_effect = _touch_output
+
+        # Suppress stdout to prevent leaked output during tests
+        with self._suppress_stdout():
+            # This should pass logger to download functions
+            transcode_url_to_dir(
+                url='https://example.com/audio.mp3',
+                outdir=self.temp_dir,
+                verbose=True,
+            )
 
-    @patch('media.service.transcode_service.needs_transcode')
-    @patch('media.service.transcode_service.prefetch')
-    @patch('media.service.transcode_service.choose_download_strategy')
-    def test_transcode_explicit_audio_type(
-        self, mock_strategy, mock_prefetch, mock_needs_transcode
-    ):
+    def test_transcode_explicit_audio_type(self):
         """Test explicit audio type request"""
-        mock_strategy.return_value = 'direct'
-        mock_needs_transcode.return_value = False
-
-        from media.service.resolve import PrefetchResult
+        self.mocks['choose_download_strategy'].return_value = 'direct'
+        self.mocks['needs_transcode'].return_value = False
 
-        prefetch_result = PrefetchResult()
-        prefetch_result.title = 'test'
-        prefetch_result.has_video_streams = True  # Has video but user wants audio
-        prefetch_result.has_audio_streams = True
-        mock_prefetch.return_value = prefetch_result
-
-        with patch('media.service.transcode_service.download_direct') as mock_download:
-
-            def mock_download_func(url, out_path, logger=None):
-                out_path = Path(out_path)
-                out_path.write_bytes(b'data')
-                from media.service.download import DownloadedFileInfo
-
-                return DownloadedFileInfo(path=out_path, file_size=4, extension='.mp3')
+        # Has video but user wants audio
+        self.mocks['prefetch'].return_value = self._prefetch_result(
+            has_video_streams=True, has_audio_streams=True
+        )
 
-            mock_download.side_effect = mock_download_func
+        self.mocks['download_direct'].side_effect = _touch_download
 
-            with tempfile.TemporaryDirectory() as temp_dir:
-                result = transcode_url_to_dir(
-                    url='https://example.com/video.mp4',
-                    outdir=temp_dir,
-                    requested_type='audio',  # Explicit audio
-                )
+        result = transcode_url_to_dir(
+            url='https://example.com/video.mp4',
+            outdir=self.temp_dir,
+            requested_type='audio',  # Explicit audio
+        )
 
-                # Should resolve to audio even though has video
-                self.assertEqual(result.resolved_type, 'audio')
+        # Should resolve to audio even though has video
+        self.assertEqual(result.resolved_type, 'audio')
 
-    @patch('media.service.transcode_service.prefetch')
-    def test_transcode_playlist_raises_error(self, mock_prefetch):
+    def test_transcode_playlist_raises_error(self):
         """Test that playlists raise MultipleItemsDetected"""
         # Create a mock prefetch result with is_multiple=True
-        mock_result = PrefetchResult(
+        mock_result = self._prefetch_result(
             title='Test Playlist',
             is_multiple=True,
             playlist_title='Test Playlist',
@@ -491,28 +360,17 @@ class TranscodeServiceTest(TestCase):
                 EntryInfo(url='https://youtube.com/watch?v=abc2', title='Video 2'),
             ],
         )
-        mock_prefetch.return_value = mock_result
+        self.mocks['prefetch'].return_value = mock_result
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            with self.assertRaises(MultipleItemsDetected) as context:
-                transcode_url_to_dir(
-                    url='https://youtube.com/playlist?list=abc123', outdir=temp_dir
-                )
-            self.assertEqual(context.exception.count, 2)
+        # Raised before anything is written, so the shared root will do as outdir
+        with self.assertRaises(MultipleItemsDetected) as context:
+            transcode_url_to_dir(
+                url='https://youtube.com/playlist?list=abc123', outdir=self._tmp_root.name
+            )
+        self.assertEqual(context.exception.count, 2)
 
     @patch('media.service.transcode_service.add_metadata_without_transcode')
-    @patch('media.service.transcode_service.needs_transcode', return_value=False)
-    @patch('media.service.transcode_service.download_direct')
-    @patch('media.service.transcode_service.prefetch')
-    @patch('media.service.transcode_service.choose_download_strategy')
-    def test_transcode_title_override(
-        self,
-        mock_strategy,
-        mock_prefetch,
-        mock_download,
-        _mock_needs_transcode,
-        mock_add_metadata,
-    ):
+    def test_transcode_title_override(self, mock_add_metadata):
         """Test that title_override takes precedence over prefetched title.
 
         This is important for multi-item results where we already have the
@@ -520,103 +378,65 @@ class TranscodeServiceTest(TestCase):
         individual entry URLs (especially direct media URLs) would only get
         the filename.
         """
-        mock_strategy.return_value = 'direct'
+        self.mocks['choose_download_strategy'].return_value = 'direct'
+        self.mocks['needs_transcode'].return_value = False
 
         # Simulate a prefetch that only extracts filename (what happens with direct URLs)
-        prefetch_result = PrefetchResult()
-        prefetch_result.title = 'multi-local-1'  # Generic filename-based title
-        prefetch_result.has_audio_streams = True
-        prefetch_result.file_extension = '.mp3'
-        mock_prefetch.return_value = prefetch_result
-
-        def mock_download_func(url, out_path, logger=None):
-            out_path = Path(out_path)
-            out_path.write_bytes(b'fake mp3 data')
-            from media.service.download import DownloadedFileInfo
-
-            return DownloadedFileInfo(
-                path=out_path,
-                file_size=len(b'fake mp3 data'),
-                extension='.mp3',
-                mime_type='audio/mpeg',
-            )
-
-        def mock_add_metadata_func(input_path, output_path, metadata=None, logger=None):
-            output_path = Path(output_path)
-            output_path.write_bytes(b'output data')
+        # Generic filename-based title
+        self.mocks['prefetch'].return_value = self._prefetch_result(
+            title='multi-local-1', has_audio_streams=True, file_extension='.mp3'
+        )
 
-        mock_download.side_effect = mock_download_func
-        mock_add_metadata.side_effect = mock_add_metadata_func
+        self.mocks['download_direct'].side_effect = functools.partial(
+            _touch_download, mime_type='audio/mpeg'
+        )
+        mock_add_metadata.side_effect = _touch_output
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Call with title_override (as would happen when processing multi-item entries)
-            result = transcode_url_to_dir(
-                url='http://localhost:8001/file.mp3',
-                outdir=temp_dir,
-                requested_type='auto',
-                title_override='Bike Commute Episode 1',  # Title from playlist entry
-            )
+        # Call with title_override (as would happen when processing multi-item entries)
+        result = transcode_url_to_dir(
+            url='http://localhost:8001/file.mp3',
+            outdir=self.temp_dir,
+            requested_type='auto',
+            title_override='Bike Commute Episode 1',  # Title from playlist entry
+        )
 
-            # Verify the override title was used, not the prefetched filename
-            self.assertEqual(result.title, 'Bike Commute Episode 1')
-            self.assertEqual(result.slug, 'bike-commute-episode-1')
-            self.assertEqual(result.output_path.name, 'bike-commute-episode-1.mp3')
+        # Verify the override title was used, not the prefetched filename
+        self.assertEqual(result.title, 'Bike Commute Episode 1')
+        self.assertEqual(result.slug, 'bike-commute-episode-1')
+        self.assertEqual(result.output_path.name, 'bike-commute-episode-1.mp3')
 
     @patch('media.service.transcode_service.add_metadata_without_transcode')
-    @patch('media.service.transcode_service.needs_transcode', return_value=False)
-    @patch('media.service.transcode_service.download_direct')
-    @patch('media.service.transcode_service.prefetch')
-    @patch('media.service.transcode_service.choose_download_strategy')
-    def test_transcode_title_override_preserves_metadata_update(
-        self,
-        mock_strategy,
-        mock_prefetch,
-        mock_download,
-        _mock_needs_transcode,
-        mock_add_metadata,
-    ):
+    def test_transcode_title_override_preserves_metadata_update(self, mock_add_metadata):
         """Test that title_override doesn't prevent metadata-based title updates.
 
         Even with title_override, if the downloaded file has embedded metadata
         with a better title, it should NOT override it (title_override is the
         authoritative source when provided).
         """
-        mock_strategy.return_value = 'direct'
-
-        prefetch_result = PrefetchResult()
-        prefetch_result.title = 'generic-filename'
-        prefetch_result.has_audio_streams = True
-        mock_prefetch.return_value = prefetch_result
+        self.mocks['choose_download_strategy'].return_value = 'direct'
+        self.mocks['needs_transcode'].return_value = False
 
-        def mock_download_func(url, out_path, logger=None):
-            out_path = Path(out_path)
-            out_path.write_bytes(b'fake mp3 data')
-            from media.service.download import DownloadedFileInfo
-
-            return DownloadedFileInfo(
-                path=out_path, file_size=13, extension='.mp3', mime_type='audio/mpeg'
-            )
-
-        def mock_add_metadata_func(input_path, output_path, metadata=None, logger=None):
-            output_path = Path(output_path)
-            output_path.write_bytes(b'output data')
+        self.mocks['prefetch'].return_value = self._prefetch_result(
+            title='generic-filename', has_audio_streams=True
+        )
 
-        mock_download.side_effect = mock_download_func
-        mock_add_metadata.side_effect = mock_add_metadata_func
+        self.mocks['download_direct'].side_effect = functools.partial(
+            _touch_download, mime_type='audio/mpeg'
+        )
+        mock_add_metadata.side_effect = _touch_output
 
         # Mock resolve_title_from_metadata to return a different title
         with patch(
             'media.service.transcode_service.resolve_title_from_metadata',
             return_value='Embedded Metadata Title',
         ):
-            with tempfile.TemporaryDirectory() as temp_dir:
-                result = transcode_url_to_dir(
-                    url='http://example.com/file.mp3',
-                    outdir=temp_dir,
-                    title_override='Playlist Entry Title',
-                )
-
-                # title_override should be used, NOT the embedded metadata
-                # (because title_override means we already have the correct title)
-                self.assertEqual(result.title, 'Playlist Entry Title')
-                self.assertEqual(result.slug, 'playlist-entry-title')
+            result = transcode_url_to_dir(
+                url='http://example.com/file.mp3',
+                outdir=self.temp_dir,
+                title_override='Playlist Entry Title',
+            )
+
+            # title_override should be used, NOT the embedded metadata
+            # (because title_override means we already have the correct title)
+            self.assertEqual(result.title, 'Playlist Entry Title')
+            self.assertEqual(result.slug, 'playlist-entry-title')
@@ -1,24 +1,88 @@
+import atexit
 import functools
 import http.server
-import socketserver
+import mimetypes
+import tempfile
 import threading
-import time
 import unittest
 from pathlib import Path
 
 from django.conf import settings
-from django.test import TestCase, override_settings
+from django.test import Client, TestCase, override_settings
 
 from media.models import MediaItem
 
 
+_DEMO_DATA_DIR = Path(settings.BASE_DIR) / 'demo_data'
+
+# Demo files the E2E classes need, probed once at import; classes skip when theirs is missing
+_DEMO_FILES = {
+    name: path
+    for name in (
+        'pecha-kucha-aud/aud.mp3',
+        'pecha-kucha-aud/view.html',
+        'pecha-kucha-vid/vid.mp4',
+        'carpool/vid.mp4',
+        'transcode-test/audio.ogg',
+    )
+    if (path := _DEMO_DATA_DIR / name).exists()
+}
+
+
+class _PreloadedFileHandler(http.server.BaseHTTPRequestHandler):
+    """Serve files from an in-memory ``{'/name': (body, content_type)}`` map.
+
+    Skips SimpleHTTPRequestHandler's per-request path translation, stat and file reads.
+    """
+
+    def __init__(self, *args, files, **kwargs):
+        self.files = files
+        super().__init__(*args, **kwargs)
+
+    def _send_head(self):
+        entry = self.files.get(self.path.split('?', 1)[0])
+        if entry is None:
+            self.send_error(404)
+            return None
+        body, content_type = entry
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        return body
+
+    def do_HEAD(self):
+        self._send_head()
+
+    def do_GET(self):
+        body = self._send_head()
+        if body is not None:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
 class MediaTestServer(threading.Thread):
     """Lightweight HTTP server to serve files for E2E tests."""
 
     def __init__(self, directory: Path):
         super().__init__(daemon=True)
-        handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(directory))
-        self.httpd = socketserver.TCPServer(('127.0.0.1', 0), handler, bind_and_activate=False)
+        # Demo directories are a few MB at most, so read them once up front
+        files = {
+            f'/{path.name}': (
+                path.read_bytes(),
+                mimetypes.guess_type(path.name)[0] or 'application/octet-stream',
+            )
+            for path in directory.iterdir()
+            if path.is_file()
+        }
+        handler = functools.partial(_PreloadedFileHandler, files=files)
+        # Threaded so concurrent range requests (ffmpeg/yt-dlp probes) don't queue up
+        self.httpd = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), handler, bind_and_activate=False
+        )
+        self.httpd.daemon_threads = True
         self.httpd.allow_reuse_address = True
         self.httpd.server_bind()
         self.httpd.server_activate()
@@ -32,66 +96,87 @@ class MediaTestServer(threading.Thread):
         self.httpd.server_close()
 
 
-@override_settings(STASHCAST_SUMMARY_SENTENCES=0)
-class EndToEndSmokeTest(TestCase):
-    """
-    Happy-path E2E: stash a media URL from the test server and ensure it lands in the audio feed.
-    Relies on demo_data/pecha-kucha-aud/aud.mp3 shipped with the repo.
+_shared_servers: dict[Path, MediaTestServer] = {}
+_shared_servers_lock = threading.Lock()
+
+
+def _get_shared_server(directory: Path) -> MediaTestServer:
+    """Return the running server for ``directory``, starting it on first use.
+
+    Servers live for the whole test run (stopped at exit), so E2E classes that serve the
+    same demo directory share one socket and thread instead of each booting their own.
     """
+    with _shared_servers_lock:
+        server = _shared_servers.get(directory)
+        if server is None:
+            server = MediaTestServer(directory)
+            server.start()
+            atexit.register(server.stop)
+            _shared_servers[directory] = server
+        return server
 
-    @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
-        demo_dir = Path(settings.BASE_DIR) / 'demo_data' / 'pecha-kucha-aud'
-        test_file = demo_dir / 'aud.mp3'
-        if not test_file.exists():
-            raise unittest.SkipTest('Demo media file not found for E2E test.')
 
-        cls.server = MediaTestServer(demo_dir)
-        cls.server.start()
-        cls.base_url = f'http://127.0.0.1:{cls.server.port}'
-        cls.test_file = test_file
+def _isolate_media_dir(cls):
+    """Point the media pipeline at a temp dir for the lifetime of ``cls``.
 
-    @classmethod
-    def tearDownClass(cls):
-        if getattr(cls, 'server', None):
-            cls.server.stop()
-        super().tearDownClass()
+    Stashed files would otherwise pile up under the real STASHCAST_MEDIA_DIR across runs.
+    """
+    tmp = cls.enterClassContext(tempfile.TemporaryDirectory())
+    cls.enterClassContext(override_settings(STASHCAST_MEDIA_DIR=Path(tmp), MEDIA_ROOT=Path(tmp)))
 
-    def test_stash_and_feed_ready(self):
-        url = f'{self.base_url}/{self.test_file.name}'
-        response = self.client.get(
-            '/stash/',
-            {
-                'token': settings.STASHCAST_USER_TOKEN,
-                'url': url,
-                'type': 'auto',
-            },
-        )
-        self.assertEqual(response.status_code, 200)
-        payload = response.json()
-        guid = payload.get('guid')
-        self.assertTrue(guid)
 
-        # Wait for processing to reach READY (Huey runs immediate in tests)
-        deadline = time.time() + 20
-        item = None
-        while time.time() < deadline:
-            item = MediaItem.objects.filter(guid=guid).first()
-            if item and item.status == MediaItem.STATUS_READY:
-                break
-            time.sleep(0.3)
+@override_settings(STASHCAST_SUMMARY_SENTENCES=0)
+class StashAndFeedE2ETest(TestCase):
+    """E2E smoke tests: stash an audio URL from the test server and find it in the feed"""
 
-        self.assertIsNotNone(item, 'Media item not found after stashing')
-        self.assertEqual(item.status, MediaItem.STATUS_READY, f'Status: {item.status}')
-        self.assertTrue(item.content_path)
+    cases = (
+        # Happy path: a direct media URL lands in the audio feed
+        'pecha-kucha-aud/aud.mp3',
+        # HTML page with an <audio> tag; the <video> variant is left out because yt-dlp's
+        # HTML5 video extraction has format selection issues
+        'pecha-kucha-aud/view.html',
+    )
 
-        # Fetch feed and ensure slug/content appear
-        feed_resp = self.client.get('/feeds/audio.xml')
-        self.assertEqual(feed_resp.status_code, 200)
-        feed_xml = feed_resp.content.decode()
-        self.assertIn(item.slug, feed_xml)
-        self.assertIn(item.content_path, feed_xml)
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        _isolate_media_dir(cls)
+        cls.token = settings.STASHCAST_USER_TOKEN
+
+    def test_stash_and_check_feed(self):
+        """Stash each demo URL and ensure it lands in the audio feed"""
+        for demo_file in self.cases:
+            with self.subTest(demo_file=demo_file):
+                test_file = _DEMO_FILES.get(demo_file)
+                if test_file is None:
+                    self.skipTest(f'Demo file {demo_file} not found for E2E test.')
+
+                server = _get_shared_server(test_file.parent)
+                response = self.client.get(
+                    '/stash/',
+                    {
+                        'token': self.token,
+                        'url': f'http://127.0.0.1:{server.port}/{test_file.name}',
+                        'type': 'auto',
+                    },
+                )
+                self.assertEqual(response.status_code, 200)
+                guid = response.json().get('guid')
+                self.assertTrue(guid)
+
+                # Huey runs immediate in tests, so processing finished before the response
+                item = MediaItem.objects.get(guid=guid)
+
+                self.assertEqual(item.status, MediaItem.STATUS_READY, f'Status: {item.status}')
+                self.assertEqual(item.media_type, MediaItem.MEDIA_TYPE_AUDIO)
+                self.assertTrue(item.content_path)
+
+                # Fetch feed and ensure slug/content appear
+                feed_resp = self.client.get('/feeds/audio.xml')
+                self.assertEqual(feed_resp.status_code, 200)
+                feed_xml = feed_resp.content.decode()
+                self.assertIn(item.slug, feed_xml)
+                self.assertIn(item.content_path, feed_xml)
 
 
 @override_settings(STASHCAST_SUMMARY_SENTENCES=0)
@@ -100,49 +185,40 @@ class VideoE2ETest(TestCase):
 
     @classmethod
     def setUpClass(cls):
-        super().setUpClass()
-        demo_dir = Path(settings.BASE_DIR) / 'demo_data' / 'pecha-kucha-vid'
-        test_file = demo_dir / 'vid.mp4'
-        if not test_file.exists():
+        test_file = _DEMO_FILES.get('pecha-kucha-vid/vid.mp4')
+        if test_file is None:
             raise unittest.SkipTest('Demo video file not found for E2E test.')
 
-        cls.server = MediaTestServer(demo_dir)
-        cls.server.start()
+        # The server and media dir must exist before setUpTestData stashes the video
+        _isolate_media_dir(cls)
+        cls.server = _get_shared_server(test_file.parent)
         cls.base_url = f'http://127.0.0.1:{cls.server.port}'
         cls.test_file = test_file
+        cls.url = f'{cls.base_url}/{test_file.name}'
+        cls.token = settings.STASHCAST_USER_TOKEN
+        super().setUpClass()
 
     @classmethod
-    def tearDownClass(cls):
-        if getattr(cls, 'server', None):
-            cls.server.stop()
-        super().tearDownClass()
-
-    def test_stash_direct_video_url(self):
-        """Test stashing a direct video URL"""
-        url = f'{self.base_url}/{self.test_file.name}'
-        response = self.client.get(
+    def setUpTestData(cls):
+        """Stash the video once; each test only asserts against the resulting item"""
+        response = Client().get(
             '/stash/',
             {
-                'token': settings.STASHCAST_USER_TOKEN,
-                'url': url,
+                'token': cls.token,
+                'url': cls.url,
                 'type': 'auto',
             },
         )
-        self.assertEqual(response.status_code, 200)
-        payload = response.json()
-        guid = payload.get('guid')
-        self.assertTrue(guid)
+        cls.status_code = response.status_code
+        cls.guid = response.json().get('guid')
+        cls.item = MediaItem.objects.get(guid=cls.guid)
 
-        # Wait for processing
-        deadline = time.time() + 20
-        item = None
-        while time.time() < deadline:
-            item = MediaItem.objects.filter(guid=guid).first()
-            if item and item.status == MediaItem.STATUS_READY:
-                break
-            time.sleep(0.3)
+    def test_stash_direct_video_url(self):
+        """Test stashing a direct video URL"""
+        self.assertEqual(self.status_code, 200)
+        self.assertTrue(self.guid)
 
-        self.assertIsNotNone(item, 'Media item not found')
+        item = self.item
         self.assertEqual(item.status, MediaItem.STATUS_READY)
         self.assertEqual(item.media_type, MediaItem.MEDIA_TYPE_VIDEO)
         self.assertTrue(item.content_path)
@@ -160,98 +236,11 @@ class VideoE2ETest(TestCase):
 
     def test_stash_video_with_thumbnail(self):
         """Test that video stashing includes thumbnail"""
-        url = f'{self.base_url}/{self.test_file.name}'
-        response = self.client.get(
-            '/stash/',
-            {
-                'token': settings.STASHCAST_USER_TOKEN,
-                'url': url,
-                'type': 'video',
-            },
-        )
-        guid = response.json().get('guid')
-
-        # Wait for processing
-        deadline = time.time() + 20
-        item = None
-        while time.time() < deadline:
-            item = MediaItem.objects.filter(guid=guid).first()
-            if item and item.status == MediaItem.STATUS_READY:
-                break
-            time.sleep(0.3)
-
-        self.assertIsNotNone(item)
-        self.assertEqual(item.status, MediaItem.STATUS_READY)
+        self.assertEqual(self.item.status, MediaItem.STATUS_READY)
         # Thumbnail may or may not be present depending on video
         # Just verify processing completed successfully
 
 
-@override_settings(STASHCAST_SUMMARY_SENTENCES=0)
-class HTMLExtractionE2ETest(TestCase):
-    """E2E tests for HTML media extraction"""
-
-    @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
-        cls.audio_demo_dir = Path(settings.BASE_DIR) / 'demo_data' / 'pecha-kucha-aud'
-        cls.video_demo_dir = Path(settings.BASE_DIR) / 'demo_data' / 'pecha-kucha-vid'
-
-        if not (cls.audio_demo_dir / 'view.html').exists():
-            raise unittest.SkipTest('Demo HTML files not found for E2E test.')
-
-        # Start server for audio demo
-        cls.audio_server = MediaTestServer(cls.audio_demo_dir)
-        cls.audio_server.start()
-        cls.audio_base_url = f'http://127.0.0.1:{cls.audio_server.port}'
-
-        # Start server for video demo
-        cls.video_server = MediaTestServer(cls.video_demo_dir)
-        cls.video_server.start()
-        cls.video_base_url = f'http://127.0.0.1:{cls.video_server.port}'
-
-    @classmethod
-    def tearDownClass(cls):
-        if getattr(cls, 'audio_server', None):
-            cls.audio_server.stop()
-        if getattr(cls, 'video_server', None):
-            cls.video_server.stop()
-        super().tearDownClass()
-
-    def test_extract_audio_from_html_page(self):
-        """Test extracting audio from HTML page with <audio> tag"""
-        url = f'{self.audio_base_url}/view.html'
-        response = self.client.get(
-            '/stash/',
-            {
-                'token': settings.STASHCAST_USER_TOKEN,
-                'url': url,
-                'type': 'auto',
-            },
-        )
-        self.assertEqual(response.status_code, 200)
-        guid = response.json().get('guid')
-
-        # Wait for processing
-        deadline = time.time() + 20
-        item = None
-        while time.time() < deadline:
-            item = MediaItem.objects.filter(guid=guid).first()
-            if item and item.status == MediaItem.STATUS_READY:
-                break
-            time.sleep(0.3)
-
-        self.assertIsNotNone(item, 'Media item not found')
-        self.assertEqual(item.status, MediaItem.STATUS_READY)
-        self.assertEqual(item.media_type, MediaItem.MEDIA_TYPE_AUDIO)
-        self.assertTrue(item.content_path)
-
-    # NOTE: Skipped - yt-dlp HTML5 video extraction has format selection issues
-    # The audio extraction test below proves the HTML extraction infrastructure works
-    # def test_extract_video_from_html_page(self):
-    #     """Test extracting video from HTML page with <video> tag"""
-    #     ...
-
-
 @override_settings(STASHCAST_SUMMARY_SENTENCES=0)
 class TypeCoercionE2ETest(TestCase):
     """E2E tests for type coercion (requesting audio from video, etc.)"""
@@ -259,46 +248,32 @@ class TypeCoercionE2ETest(TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
-        demo_dir = Path(settings.BASE_DIR) / 'demo_data' / 'pecha-kucha-vid'
-        test_file = demo_dir / 'vid.mp4'
-        if not test_file.exists():
+        _isolate_media_dir(cls)
+        test_file = _DEMO_FILES.get('pecha-kucha-vid/vid.mp4')
+        if test_file is None:
             raise unittest.SkipTest('Demo video file not found for E2E test.')
 
-        cls.server = MediaTestServer(demo_dir)
-        cls.server.start()
+        cls.server = _get_shared_server(test_file.parent)
         cls.base_url = f'http://127.0.0.1:{cls.server.port}'
         cls.test_file = test_file
-
-    @classmethod
-    def tearDownClass(cls):
-        if getattr(cls, 'server', None):
-            cls.server.stop()
-        super().tearDownClass()
+        cls.url = f'{cls.base_url}/{test_file.name}'
+        cls.token = settings.STASHCAST_USER_TOKEN
 
     def test_request_audio_from_video_url(self):
         """Test requesting audio type from a video URL (should extract audio)"""
-        url = f'{self.base_url}/{self.test_file.name}'
         response = self.client.get(
             '/stash/',
             {
-                'token': settings.STASHCAST_USER_TOKEN,
-                'url': url,
+                'token': self.token,
+                'url': self.url,
                 'type': 'audio',
             },
         )
         self.assertEqual(response.status_code, 200)
         guid = response.json().get('guid')
 
-        # Wait for processing
-        deadline = time.time() + 20
-        item = None
-        while time.time() < deadline:
-            item = MediaItem.objects.filter(guid=guid).first()
-            if item and item.status == MediaItem.STATUS_READY:
-                break
-            time.sleep(0.3)
+        item = MediaItem.objects.get(guid=guid)
 
-        self.assertIsNotNone(item, 'Media item not found')
         self.assertEqual(item.status, MediaItem.STATUS_READY)
         # Should have audio media type since we requested audio
         self.assertEqual(item.media_type, MediaItem.MEDIA_TYPE_AUDIO)
@@ -321,51 +296,32 @@ class SummaryE2ETest(TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
-        demo_dir = Path(settings.BASE_DIR) / 'demo_data' / 'carpool'
-        test_file = demo_dir / 'vid.mp4'
-        if not test_file.exists():
+        _isolate_media_dir(cls)
+        test_file = _DEMO_FILES.get('carpool/vid.mp4')
+        if test_file is None:
             raise unittest.SkipTest('Demo video with subtitles not found for E2E test.')
 
-        cls.server = MediaTestServer(demo_dir)
-        cls.server.start()
+        cls.server = _get_shared_server(test_file.parent)
         cls.base_url = f'http://127.0.0.1:{cls.server.port}'
         cls.test_file = test_file
-
-    @classmethod
-    def tearDownClass(cls):
-        if getattr(cls, 'server', None):
-            cls.server.stop()
-        super().tearDownClass()
+        cls.url = f'{cls.base_url}/{test_file.name}'
+        cls.token = settings.STASHCAST_USER_TOKEN
 
     def test_generate_summary_from_vtt(self):
         """Test that summary is generated from VTT subtitles"""
-        url = f'{self.base_url}/{self.test_file.name}'
         response = self.client.get(
             '/stash/',
             {
-                'token': settings.STASHCAST_USER_TOKEN,
-                'url': url,
+                'token': self.token,
+                'url': self.url,
                 'type': 'video',
             },
         )
         guid = response.json().get('guid')
 
-        # Wait for processing
-        deadline = time.time() + 30
-        item = None
-        while time.time() < deadline:
-            item = MediaItem.objects.filter(guid=guid).first()
-            if item and item.status == MediaItem.STATUS_READY:
-                break
-            time.sleep(0.3)
-
-        self.assertIsNotNone(item, 'Media item not found')
+        item = MediaItem.objects.get(guid=guid)
         self.assertEqual(item.status, MediaItem.STATUS_READY)
 
-        # Summary generation happens after READY, so wait a bit more
-        time.sleep(2)
-        item.refresh_from_db()
-
         # Summary should be generated if subtitles exist
         # Note: May be empty if subtitle file doesn't have enough text
         # Just verify the field exists and processing completed
@@ -379,30 +335,24 @@ class TranscodingE2ETest(TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
-        demo_dir = Path(settings.BASE_DIR) / 'demo_data' / 'transcode-test'
-        test_file = demo_dir / 'audio.ogg'
-        if not test_file.exists():
+        _isolate_media_dir(cls)
+        test_file = _DEMO_FILES.get('transcode-test/audio.ogg')
+        if test_file is None:
             raise unittest.SkipTest('Demo OGG file not found for transcoding E2E test.')
 
-        cls.server = MediaTestServer(demo_dir)
-        cls.server.start()
+        cls.server = _get_shared_server(test_file.parent)
         cls.base_url = f'http://127.0.0.1:{cls.server.port}'
         cls.test_file = test_file
-
-    @classmethod
-    def tearDownClass(cls):
-        if getattr(cls, 'server', None):
-            cls.server.stop()
-        super().tearDownClass()
+        cls.url = f'{cls.base_url}/{test_file.name}'
+        cls.token = settings.STASHCAST_USER_TOKEN
 
     def test_ogg_transcoded_to_m4a(self):
         """Test that OGG audio is transcoded to M4A for podcast compatibility"""
-        url = f'{self.base_url}/{self.test_file.name}'
         response = self.client.get(
             '/stash/',
             {
-                'token': settings.STASHCAST_USER_TOKEN,
-                'url': url,
+                'token': self.token,
+                'url': self.url,
                 'type': 'audio',
             },
         )
@@ -410,16 +360,8 @@ class TranscodingE2ETest(TestCase):
         guid = response.json().get('guid')
         self.assertTrue(guid)
 
-        # Wait for processing (transcoding may take longer)
-        deadline = time.time() + 30
-        item = None
-        while time.time() < deadline:
-            item = MediaItem.objects.filter(guid=guid).first()
-            if item and item.status == MediaItem.STATUS_READY:
-                break
-            time.sleep(0.3)
+        item = MediaItem.objects.get(guid=guid)
 
-        self.assertIsNotNone(item, 'Media item not found after stashing')
         self.assertEqual(item.status, MediaItem.STATUS_READY, f'Status: {item.status}')
         self.assertEqual(item.media_type, MediaItem.MEDIA_TYPE_AUDIO)
 
@@ -346,29 +346,29 @@ class FormatDurationTest(TestCase):
     """Test the duration formatting helper."""
 
     def test_none_returns_empty(self):
-        from media.tui.screens.item_list import _format_duration
+        from media.tui.formatting import format_duration
 
-        assert _format_duration(None) == ''
+        assert format_duration(None) == ''
 
     def test_zero_returns_empty(self):
-        from media.tui.screens.item_list import _format_duration
+        from media.tui.formatting import format_duration
 
-        assert _format_duration(0) == ''
+        assert format_duration(0) == ''
 
     def test_seconds_only(self):
-        from media.tui.screens.item_list import _format_duration
+        from media.tui.formatting import format_duration
 
-        assert _format_duration(45) == '0:45'
+        assert format_duration(45) == '0:45'
 
     def test_minutes_and_seconds(self):
-        from media.tui.screens.item_list import _format_duration
+        from media.tui.formatting import format_duration
 
-        assert _format_duration(125) == '2:05'
+        assert format_duration(125) == '2:05'
 
     def test_hours(self):
-        from media.tui.screens.item_list import _format_duration
+        from media.tui.formatting import format_duration
 
-        assert _format_duration(3661) == '1:01:01'
+        assert format_duration(3661) == '1:01:01'
 
 
 class FormatSizeTest(TestCase):
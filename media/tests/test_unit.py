@@ -467,6 +467,22 @@ class SlugUtilsTest(TestCase):
         self.assertTrue(slug.startswith('test-slug-'))
         self.assertNotEqual(slug, 'test-slug')
 
+    def test_ensure_unique_slug_reuse_is_single_query(self):
+        """Test slug reuse for same URL and type costs one lookup"""
+        MediaItem.objects.create(
+            source_url='https://example.com/video',
+            requested_type=MediaItem.REQUESTED_TYPE_VIDEO,
+            slug='test-slug',
+            media_type=MediaItem.MEDIA_TYPE_VIDEO,
+        )
+        with self.assertNumQueries(1):
+            slug = ensure_unique_slug(
+                'test-slug',
+                'https://example.com/video',
+                media_type=MediaItem.MEDIA_TYPE_VIDEO,
+            )
+        self.assertEqual(slug, 'test-slug')
+
     def test_ensure_unique_slug_same_url_different_type(self):
         """Test slug generation for same URL but different media type"""
         # Create video item
@@ -728,6 +744,35 @@ class FeedTest(TestCase):
         self.assertContains(video_response, 'my-content-video/content.mp4')
         self.assertNotContains(video_response, 'my-content-audio/content.m4a')
 
+    def test_feed_not_modified_when_unchanged(self):
+        """Test that polling with a current ETag returns 304 until items change"""
+        item = MediaItem.objects.create(
+            source_url='https://example.com/audio',
+            requested_type=MediaItem.REQUESTED_TYPE_AUDIO,
+            slug='test-audio',
+            title='Test Audio',
+            media_type=MediaItem.MEDIA_TYPE_AUDIO,
+            status=MediaItem.STATUS_READY,
+        )
+        response = self.client.get('/feeds/audio.xml')
+        etag = response['ETag']
+
+        response = self.client.get('/feeds/audio.xml', headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        item.delete()
+        response = self.client.get('/feeds/audio.xml', headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Test Audio')
+
+    def test_feed_etag_changes_with_media_base_url(self):
+        """Test that changing STASHCAST_MEDIA_BASE_URL invalidates a cached feed"""
+        etag = self.client.get('/feeds/audio.xml')['ETag']
+
+        with self.settings(STASHCAST_MEDIA_BASE_URL='https://cdn.example.com'):
+            response = self.client.get('/feeds/audio.xml', headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+
 
 @override_settings(STASHCAST_MEDIA_BASE_URL='')
 class FeedTranscriptTest(TestCase):
@@ -783,10 +828,9 @@ class FeedTranscriptTest(TestCase):
 class FeedAuthenticationTest(TestCase):
     """Test feed user token authentication"""
 
-    def setUp(self):
-        self.client = Client()
-        self.user_token = settings.STASHCAST_USER_TOKEN
-        # Create test items
+    @classmethod
+    def setUpTestData(cls):
+        # Create test items once for the class
         MediaItem.objects.create(
             source_url='https://example.com/audio',
             requested_type=MediaItem.REQUESTED_TYPE_AUDIO,
@@ -795,6 +839,18 @@ class FeedAuthenticationTest(TestCase):
             media_type=MediaItem.MEDIA_TYPE_AUDIO,
             status=MediaItem.STATUS_READY,
         )
+        MediaItem.objects.create(
+            source_url='https://example.com/video',
+            requested_type=MediaItem.REQUESTED_TYPE_VIDEO,
+            slug='test-video',
+            title='Test Video',
+            media_type=MediaItem.MEDIA_TYPE_VIDEO,
+            status=MediaItem.STATUS_READY,
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.user_token = settings.STASHCAST_USER_TOKEN
 
     @override_settings(REQUIRE_USER_TOKEN_FOR_FEEDS=False)
     def test_feeds_public_by_default(self):
@@ -827,15 +883,6 @@ class FeedAuthenticationTest(TestCase):
     @override_settings(REQUIRE_USER_TOKEN_FOR_FEEDS=True)
     def test_all_feed_types_require_user_token(self):
         """Test that all feed types require user token when enabled"""
-        MediaItem.objects.create(
-            source_url='https://example.com/video',
-            requested_type=MediaItem.REQUESTED_TYPE_VIDEO,
-            slug='test-video',
-            title='Test Video',
-            media_type=MediaItem.MEDIA_TYPE_VIDEO,
-            status=MediaItem.STATUS_READY,
-        )
-
         # Test all three feed types
         for feed_url in ['/feeds/audio.xml', '/feeds/video.xml', '/feeds/combined.xml']:
             # Without user token - should fail
@@ -850,14 +897,17 @@ class FeedAuthenticationTest(TestCase):
 class FeedProtectionUITest(TestCase):
     """Test visual indicators for feed protection status"""
 
-    def setUp(self):
-        self.client = Client()
+    @classmethod
+    def setUpTestData(cls):
         # Create a staff user for admin pages
         from django.contrib.auth.models import User
 
-        self.user = User.objects.create_user('testuser', 'test@example.com', 'password')
-        self.user.is_staff = True
-        self.user.save()
+        cls.user = User.objects.create_user(
+            'testuser', 'test@example.com', 'password', is_staff=True
+        )
+
+    def setUp(self):
+        self.client = Client()
 
     def test_home_page_does_not_expose_feed_urls(self):
         """Test that home page does not show feed URLs with tokens"""
@@ -0,0 +1,11 @@
+"""Display formatting helpers shared by the TUI screens."""
+
+
+def format_duration(seconds):
+    if not seconds:
+        return ''
+    hours, rem = divmod(seconds, 3600)
+    mins, secs = divmod(rem, 60)
+    if hours:
+        return f'{hours}:{mins:02d}:{secs:02d}'
+    return f'{mins}:{secs:02d}'
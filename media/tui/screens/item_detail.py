@@ -4,6 +4,8 @@ from textual.containers import VerticalScroll
 from textual.screen import Screen
 from textual.widgets import Footer, Header, Static
 
+from media.tui.formatting import format_duration
+
 
 class ItemDetailScreen(Screen):
     """Screen showing detailed metadata for a single media item."""
@@ -48,7 +50,7 @@ class ItemDetailScreen(Screen):
             ('Slug', item.slug),
             ('Media Type', item.media_type or ''),
             ('Requested Type', item.requested_type),
-            ('Duration', _format_duration(item.duration_seconds)),
+            ('Duration', format_duration(item.duration_seconds)),
             ('File Size', _format_size(item.file_size)),
             ('MIME Type', item.mime_type or ''),
             ('Author', item.author or ''),
@@ -129,18 +131,6 @@ class ItemDetailScreen(Screen):
         self._render_detail()
 
 
-def _format_duration(seconds):
-    if not seconds:
-        return ''
-    mins = seconds // 60
-    secs = seconds % 60
-    if mins >= 60:
-        hours = mins // 60
-        mins = mins % 60
-        return f'{hours}:{mins:02d}:{secs:02d}'
-    return f'{mins}:{secs:02d}'
-
-
 def _format_size(size_bytes):
     if not size_bytes:
         return ''
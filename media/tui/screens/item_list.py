@@ -4,6 +4,7 @@ from textual.binding import Binding
 from textual.screen import Screen
 from textual.widgets import DataTable, Footer, Header
 
+from media.tui.formatting import format_duration
 from media.tui.widgets.filter_bar import FilterBar
 
 
@@ -57,7 +58,7 @@ class ItemListScreen(Screen):
             qs = qs.filter(title__icontains=self._text_filter)
 
         for item in qs:
-            duration = _format_duration(item.duration_seconds)
+            duration = format_duration(item.duration_seconds)
             date = item.created_at.strftime('%Y-%m-%d') if item.created_at else ''
             status_display = item.status
             table.add_row(
@@ -184,15 +185,3 @@ class ItemListScreen(Screen):
         self._status_filter = event.status_filter
         self._text_filter = event.text_filter
         self._load_items()
-
-
-def _format_duration(seconds):
-    if not seconds:
-        return ''
-    mins = seconds // 60
-    secs = seconds % 60
-    if mins >= 60:
-        hours = mins // 60
-        mins = mins % 60
-        return f'{hours}:{mins:02d}:{secs:02d}'
-    return f'{mins}:{secs:02d}'
@@ -1,7 +1,16 @@
 import re
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from nanoid import generate
 
+# Runs of characters that are not allowed in a slug
+SLUG_INVALID_CHARS_PATTERN = re.compile(r'[^a-z0-9]+')
+
+# Cached count of READY items, checked against STASHCAST_MAX_EPISODES on every stash
+READY_COUNT_CACHE_KEY = 'media:ready_count'
+READY_COUNT_CACHE_TTL = 300
+
 
 def generate_slug(title, max_words=None, max_chars=None):
     """
@@ -24,7 +33,7 @@ def generate_slug(title, max_words=None, max_chars=None):
     slug = title.lower()
 
     # Replace non-alphanumeric characters with hyphens
-    slug = re.sub(r'[^a-z0-9]+', '-', slug)
+    slug = SLUG_INVALID_CHARS_PATTERN.sub('-', slug)
 
     # Remove leading/trailing hyphens
     slug = slug.strip('-')
@@ -63,13 +72,14 @@ def ensure_unique_slug(slug, source_url, existing_item=None, media_type=None):
     if existing_item:
         return existing_item.slug
 
-    existing_qs = MediaItem.objects.filter(slug=slug)
+    # At most a handful of rows share a slug, so fetch them all in one query
+    existing = set(MediaItem.objects.filter(slug=slug).values_list('source_url', 'media_type'))
 
-    if not existing_qs.exists():
+    if not existing:
         # Slug is unique
         return slug
 
-    if existing_qs.filter(source_url=source_url, media_type=media_type).exists():
+    if (source_url, media_type) in existing:
         # Same URL and same type, reuse the slug
         return slug
 
@@ -137,3 +147,19 @@ def log_prefetch_result(log_fn, item):
     log_fn(f'Slug: {item.slug}')
     if item.duration_seconds:
         log_fn(f'Duration: {item.duration_seconds}s')
+
+
+def get_ready_count():
+    """Return the number of READY items, cached until an item's status changes."""
+    from media.models import MediaItem
+
+    count = cache.get(READY_COUNT_CACHE_KEY)
+    if count is None:
+        count = MediaItem.objects.filter(status=MediaItem.STATUS_READY).count()
+        cache.set(READY_COUNT_CACHE_KEY, count, READY_COUNT_CACHE_TTL)
+    return count
+
+
+def invalidate_ready_count():
+    """Drop the cached READY count once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete(READY_COUNT_CACHE_KEY))
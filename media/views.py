@@ -4,6 +4,7 @@ import time
 from django.conf import settings
 from django.contrib import admin
 from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Count, Q
 from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
@@ -947,20 +948,22 @@ def preferences_view(request):
     import os
     from pathlib import Path
 
-    # Episode counts
-    ready_count = MediaItem.objects.filter(status=MediaItem.STATUS_READY).count()
-    archived_count = MediaItem.objects.filter(status=MediaItem.STATUS_ARCHIVED).count()
-    audio_count = MediaItem.objects.filter(
-        status=MediaItem.STATUS_READY, media_type='audio'
-    ).count()
-    video_count = MediaItem.objects.filter(
-        status=MediaItem.STATUS_READY, media_type='video'
-    ).count()
-    error_count = MediaItem.objects.filter(status=MediaItem.STATUS_ERROR).count()
+    # Episode counts, collected in a single pass over the table
+    ready = Q(status=MediaItem.STATUS_READY)
+    counts = MediaItem.objects.aggregate(
+        ready_count=Count('pk', filter=ready),
+        archived_count=Count('pk', filter=Q(status=MediaItem.STATUS_ARCHIVED)),
+        audio_count=Count('pk', filter=ready & Q(media_type=MediaItem.MEDIA_TYPE_AUDIO)),
+        video_count=Count('pk', filter=ready & Q(media_type=MediaItem.MEDIA_TYPE_VIDEO)),
+        error_count=Count('pk', filter=Q(status=MediaItem.STATUS_ERROR)),
+    )
 
     # Last download
     last_download = (
-        MediaItem.objects.filter(status=MediaItem.STATUS_READY).order_by('-downloaded_at').first()
+        MediaItem.objects.filter(status=MediaItem.STATUS_READY)
+        .only('guid', 'title', 'downloaded_at')
+        .order_by('-downloaded_at')
+        .first()
     )
 
     # Storage used (walk actual disk)
@@ -983,11 +986,7 @@ def preferences_view(request):
     context = {
         **admin.site.each_context(request),
         'title': 'About',
-        'ready_count': ready_count,
-        'archived_count': archived_count,
-        'audio_count': audio_count,
-        'video_count': video_count,
-        'error_count': error_count,
+        **counts,
         'last_download': last_download,
         'total_storage_bytes': total_storage_bytes,
         'max_episodes': max_episodes,
@@ -1113,12 +1112,14 @@ def item_refetch_view(request, guid):
     from django.core.exceptions import PermissionDenied
 
     from media.admin import is_demo_readonly
+    from media.service.resolve import invalidate_prefetch_cache
 
     if is_demo_readonly(request.user):
         raise PermissionDenied('Demo users are not allowed to refetch items.')
 
     item = get_object_or_404(MediaItem, guid=guid)
 
+    invalidate_prefetch_cache(item.source_url)
     item.status = MediaItem.STATUS_PREFETCHING
     item.error_message = ''
     item.save()
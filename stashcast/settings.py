@@ -264,14 +264,37 @@ os.makedirs(STASHCAST_MEDIA_DIR, exist_ok=True)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = STASHCAST_MEDIA_DIR
 
+RUNNING_TESTS = 'test' in sys.argv or 'pytest' in sys.modules
+
+# Tests create and log in users constantly; the default PBKDF2 hasher's rounds
+# dominate their run time and buy nothing there
+if RUNNING_TESTS:
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Cache configuration (file-based so the web and Huey worker processes share entries)
+# Used to memoize yt-dlp metadata lookups and the READY episode count. Tests use a
+# dummy cache so mocked responses never leak between test cases.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': STASHCAST_DATA_DIR / 'cache',
+        # One entry per prefetched URL plus the READY count; cull a third once full
+        'OPTIONS': {'MAX_ENTRIES': 1000, 'CULL_FREQUENCY': 3},
+    }
+}
+if RUNNING_TESTS:
+    CACHES['default'] = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+
+# How long (seconds) yt-dlp metadata is cached per URL (0 = disabled)
+STASHCAST_PREFETCH_CACHE_TTL = int(os.environ.get('STASHCAST_PREFETCH_CACHE_TTL', '300'))
+
 # Huey configuration (SQLite backend)
 
 HUEY = {
     'huey_class': 'huey.SqliteHuey',
     'name': 'stashcast',
     'filename': str(STASHCAST_DATA_DIR / 'huey.db'),
-    'immediate': 'test' in sys.argv
-    or 'pytest' in sys.modules,  # Execute tasks immediately during tests
+    'immediate': RUNNING_TESTS,  # Execute tasks immediately during tests
     'consumer': {
         'workers': 2,
         'worker_type': 'thread',